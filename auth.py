@@ -2,12 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import hashlib
-import json
-import urllib.request
-import urllib.error
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+from typing import Callable
+
+from config import load_config
+from session import SessionStore
+from userdb import ShardedUserStore
 
 
 class AuthWindow:
@@ -25,6 +27,7 @@ class AuthWindow:
     INPUT_BG = "#161b22"
     
     GITHUB_DB_URL = "https://raw.githubusercontent.com/NNCmef/GITHUB_DB_URL/main/users.json"
+    GITHUB_SHARDS_URL = "https://raw.githubusercontent.com/NNCmef/GITHUB_DB_URL/main/users/"
     
     def __init__(self, root, on_success_callback):
         self.root = root
@@ -39,6 +42,11 @@ class AuthWindow:
         self.attempts = 0
         self.max_attempts = 5
         
+        config = load_config()
+        self.user_store = self.create_user_store(config)
+        # A successful login leaves a signed token so later launches skip this window
+        self.sessions = SessionStore.from_config(config)
+        
         self.setup_theme()
         self.setup_ui()
         self.center_window()
@@ -46,6 +54,17 @@ class AuthWindow:
         self.root.attributes('-topmost', True)
         self.root.after_idle(lambda: self.root.attributes('-topmost', False))
     
+    @classmethod
+    def create_user_store(cls, config: dict) -> ShardedUserStore:
+        # Sharded user DB (flat users.json as fallback), cached locally and
+        # revalidated with conditional requests
+        return ShardedUserStore(
+            cls.GITHUB_SHARDS_URL,
+            cls.GITHUB_DB_URL,
+            fresh_for=float(config.get("auth_db_fresh_for", 120)),
+            max_stale=float(config.get("auth_db_max_stale", 24 * 3600)),
+        )
+    
     def _on_close(self):
         self.root.quit()
         self.root.destroy()
@@ -188,29 +207,6 @@ class AuthWindow:
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
     
-    def fetch_user_db(self):
-        try:
-            req = urllib.request.Request(
-                self.GITHUB_DB_URL,
-                headers={'User-Agent': 'Mozilla/5.0'}
-            )
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if response.getcode() != 200:
-                    return None
-                data = response.read().decode('utf-8')
-                if len(data) > 100000:
-                    return None
-                parsed = json.loads(data)
-                if not isinstance(parsed, dict):
-                    return None
-                return parsed
-        except urllib.error.URLError:
-            return None
-        except json.JSONDecodeError:
-            return None
-        except Exception:
-            return None
-    
     def authenticate(self):
         if self.attempts >= self.max_attempts:
             self.status_label.config(
@@ -251,16 +247,20 @@ class AuthWindow:
         thread.start()
     
     def _auth_thread(self, username, password):
-        user_db = self.fetch_user_db()
-        
-        if user_db is None:
+        try:
+            stored_hash = self.user_store.lookup(username)
+        except Exception:
             self.root.after(0, self._auth_failed, "Failed to connect to authentication server")
             return
         
         password_hash = self.hash_password(password)
         
-        if username in user_db and user_db[username] == password_hash:
+        if stored_hash is not None and stored_hash == password_hash:
             self.authenticated = True
+            try:
+                self.sessions.issue(username, stored_hash)
+            except OSError:
+                pass  # No token this time; the next launch asks again
             self.root.after(0, self._auth_success)
         else:
             self.root.after(0, self._auth_failed, "Invalid username or password")
@@ -293,3 +293,26 @@ class AuthWindow:
         self.root.update()
         self.root.after(50, lambda: [self.root.destroy(), callback() if callback else None])
 
+
+def show_login() -> bool:
+    """Run the login window on its own Tk root; True once the user got in"""
+    root = tk.Tk()
+    window = AuthWindow(root, None)
+    root.mainloop()
+    return window.authenticated
+
+
+def revalidate_session(session: dict, on_revoked: Callable[[], None], config: dict = None):
+    """Check an offline-verified session against the user store in the background.
+
+    Calls on_revoked (from the checking thread) if the user was removed or
+    their password changed; an unreachable store leaves the session alone.
+    """
+    config = config or load_config()
+    
+    def check():
+        user_store = AuthWindow.create_user_store(config)
+        if SessionStore.from_config(config).revalidate(session, user_store) is False:
+            on_revoked()
+    
+    threading.Thread(target=check, name="session-revalidate", daemon=True).start()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from config import get_app_dir, load_config
+
+
+class TranslationBackend:
+    """Interface every translation engine implements.
+
+    `translate` receives one segment of Russian text (already under the
+    provider limit) and returns its English translation, raising on failure.
+    `timeout` is the most seconds the call may take (None: the transport
+    defaults); network engines pass it down to their requests.
+    Implementations must be safe to call from several threads.
+
+    `translate_scheduled` is what the translation service calls: it admits
+    the call through the provider's shared scheduler first.
+    """
+
+    name = ""
+    max_chars = 5000  # Longest segment the provider accepts
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or {}
+
+    @classmethod
+    def provider_name(cls, config: dict) -> str:
+        """Provider the answers come from; its cache entries and scheduler are shared"""
+        return cls.name
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> str:
+        raise NotImplementedError
+
+    def translate_scheduled(self, text: str, priority: int, deadline: Optional[float] = None) -> str:
+        """translate, admitted by the provider's shared scheduler and bounded by a monotonic deadline"""
+        from resilience import DeadlineExceeded
+        from scheduler import get_scheduler
+
+        def attempt():
+            if deadline is None:
+                return self.translate(text)
+            # Time spent queueing in the scheduler comes out of the same budget
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Request deadline passed while waiting for the provider")
+            return self.translate(text, timeout=remaining)
+
+        scheduler = get_scheduler(self.name, self.config)
+        return scheduler.call(attempt, priority=priority, is_throttled=self.is_throttled)
+
+    def is_transient(self, exc: Exception) -> bool:
+        """Whether a failure is worth retrying (network trouble, throttling, 5xx)"""
+        return isinstance(exc, OSError)
+
+    def is_throttled(self, exc: Exception) -> bool:
+        """Whether the provider refused the call for going too fast (HTTP 429)"""
+        return False
+
+
+BACKENDS: Dict[str, Type[TranslationBackend]] = {}
+
+
+def register_backend(cls: Type[TranslationBackend]) -> Type[TranslationBackend]:
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def available_backends():
+    return sorted(BACKENDS)
+
+
+def resolve_backend(name: Optional[str] = None, config: Optional[dict] = None) -> Type[TranslationBackend]:
+    config = config or load_config()
+    name = name or os.environ.get("PROMPT_COMPILER_BACKEND") or config.get("backend", "google")
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown translation backend '{name}'. Available: {', '.join(available_backends())}"
+        )
+
+
+def create_backend(name: Optional[str] = None, config: Optional[dict] = None) -> TranslationBackend:
+    config = config or load_config()
+    return resolve_backend(name, config)(config)
+
+
+@register_backend
+class GoogleBackend(TranslationBackend):
+    """Google Translate over the shared keep-alive transport.
+
+    Sends the same request deep_translator's GoogleTranslator does, but
+    through the pooled session instead of a fresh connection per call.
+    """
+
+    name = "google"
+    DEFAULT_URL = "https://translate.google.com/m"
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        from transport import get_transport
+
+        self.url = self.config.get("google_url") or self.DEFAULT_URL
+        self.transport = get_transport(self.config)
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> str:
+        from bs4 import BeautifulSoup  # pyright: ignore[reportMissingImports]
+        from deep_translator.exceptions import (  # pyright: ignore[reportMissingImports]
+            RequestError,
+            TooManyRequests,
+            TranslationNotFound,
+        )
+
+        text = text.strip()
+        if not text:
+            return text
+        response = self.transport.get(
+            self.url, params={"tl": "en", "sl": "ru", "q": text}, timeout=self.transport.bounded(timeout)
+        )
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code != 200:
+            raise RequestError()
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+        if not element:
+            raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+    def is_transient(self, exc: Exception) -> bool:
+        from deep_translator.exceptions import RequestError, TooManyRequests  # pyright: ignore[reportMissingImports]
+
+        return isinstance(exc, (OSError, RequestError, TooManyRequests))
+
+    def is_throttled(self, exc: Exception) -> bool:
+        from deep_translator.exceptions import TooManyRequests  # pyright: ignore[reportMissingImports]
+
+        return isinstance(exc, TooManyRequests)
+
+
+@register_backend
+class MyMemoryBackend(TranslationBackend):
+    """MyMemory (api.mymemory.translated.net), a second public provider.
+
+    Useful as the secondary of a hedged backend. Set `mymemory_email` in
+    config to get the larger daily quota.
+    """
+
+    name = "mymemory"
+    DEFAULT_URL = "https://api.mymemory.translated.net/get"
+    max_chars = 500
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        from transport import get_transport
+
+        self.url = self.config.get("mymemory_url") or self.DEFAULT_URL
+        self.email = self.config.get("mymemory_email")
+        self.transport = get_transport(self.config)
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> str:
+        from deep_translator.exceptions import (  # pyright: ignore[reportMissingImports]
+            RequestError,
+            TooManyRequests,
+            TranslationNotFound,
+        )
+
+        text = text.strip()
+        if not text:
+            return text
+        params = {"q": text, "langpair": "ru|en"}
+        if self.email:
+            params["de"] = self.email
+        response = self.transport.get(self.url, params=params, timeout=self.transport.bounded(timeout))
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code != 200:
+            raise RequestError()
+
+        try:
+            data = response.json()
+        except ValueError:
+            raise RequestError()
+        if data.get("responseStatus") == 429:
+            raise TooManyRequests()
+        translation = (data.get("responseData") or {}).get("translatedText")
+        if not translation or data.get("responseStatus") not in (200, "200"):
+            raise TranslationNotFound(text)
+        return translation
+
+    def is_transient(self, exc: Exception) -> bool:
+        from deep_translator.exceptions import RequestError, TooManyRequests  # pyright: ignore[reportMissingImports]
+
+        return isinstance(exc, (OSError, RequestError, TooManyRequests))
+
+    def is_throttled(self, exc: Exception) -> bool:
+        from deep_translator.exceptions import TooManyRequests  # pyright: ignore[reportMissingImports]
+
+        return isinstance(exc, TooManyRequests)
+
+
+# Small built-in phrase table for the offline engine. Users extend it with
+# a JSON {"русская фраза": "english phrase"} file (`dictionary_path` in config).
+BUILTIN_PHRASES = {
+    "и": "and", "или": "or", "не": "not", "в": "in", "во": "in", "на": "on", "с": "with",
+    "со": "with", "для": "for", "из": "from", "к": "to", "по": "by", "от": "from", "до": "to",
+    "что": "that", "как": "how", "это": "this", "этот": "this", "эта": "this", "все": "all",
+    "все тесты": "all tests", "который": "which", "которая": "which", "которые": "which",
+    "если": "if", "то": "then", "чтобы": "so that", "без": "without", "при": "on",
+    "создай": "create", "создать": "create", "сделай": "make", "напиши": "write",
+    "написать": "write", "добавь": "add", "добавить": "add", "удали": "remove",
+    "удалить": "remove", "исправь": "fix", "исправить": "fix", "измени": "change",
+    "изменить": "change", "обнови": "update", "обновить": "update", "перепиши": "rewrite",
+    "переименуй": "rename", "объясни": "explain", "проверь": "check", "оптимизируй": "optimize",
+    "используй": "use", "использовать": "use", "запусти": "run", "вынеси": "extract",
+    "функция": "function", "функцию": "function", "функции": "functions", "метод": "method",
+    "класс": "class", "модуль": "module", "файл": "file", "файлы": "files", "папка": "folder",
+    "тест": "test", "тесты": "tests", "ошибка": "error", "ошибку": "error", "ошибки": "errors",
+    "баг": "bug", "код": "code", "кода": "code", "переменная": "variable", "переменную": "variable",
+    "список": "list", "словарь": "dictionary", "строка": "string", "строку": "string",
+    "число": "number", "числа": "number", "массив": "array", "значение": "value",
+    "запрос": "request", "ответ": "response", "сервер": "server", "клиент": "client",
+    "база данных": "database", "базу данных": "database", "базе данных": "database", "таблица": "table", "поле": "field",
+    "кнопка": "button", "кнопку": "button", "окно": "window", "страница": "page",
+    "компонент": "component", "интерфейс": "interface", "пользователь": "user",
+    "пользователя": "user", "пароль": "password", "логин": "login", "проект": "project",
+    "вычисления": "calculating", "вычисляет": "calculates", "факториала": "factorial",
+    "факториал": "factorial", "сортировки": "sorting", "сортировка": "sorting",
+    "новый": "new", "новую": "new", "новое": "new", "старый": "old", "все ошибки": "all errors",
+    "быстрее": "faster", "медленно": "slowly", "правильно": "correctly", "пожалуйста": "please",
+    "нужно": "need to", "надо": "need to", "можно": "can", "должен": "must", "должна": "must",
+}
+
+_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+}
+
+_ENDINGS = sorted(
+    ["ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими", "ую", "юю", "ая", "яя", "ой",
+     "ый", "ий", "ые", "ие", "ов", "ев", "ам", "ям", "ах", "ях", "ом", "ем", "и", "ы", "а",
+     "я", "у", "ю", "е", "о"],
+    key=len, reverse=True,
+)
+
+_TOKEN_RE = re.compile(r"[А-Яа-яЁё]+|[^А-Яа-яЁё]+")
+_CYRILLIC_RE = re.compile(r"[А-Яа-яЁё]")
+
+
+def _norm(word: str) -> str:
+    return word.lower().replace("ё", "е")
+
+
+def _stem(word: str) -> str:
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+def transliterate(word: str) -> str:
+    result = "".join(_TRANSLIT.get(ch, ch) for ch in word.lower())
+    return result.capitalize() if word[:1].isupper() else result
+
+
+@register_backend
+class DictionaryBackend(TranslationBackend):
+    """Fully offline phrase-table engine.
+
+    Translates by greedy longest-match over the phrase table, falls back to
+    a crude stem match and transliterates anything still unknown. Output is
+    rough, but it never touches the network, which makes it suitable for
+    air-gapped machines and for benchmarking the rest of the pipeline.
+    """
+
+    name = "dictionary"
+    MAX_PHRASE_WORDS = 4
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        phrases = dict(BUILTIN_PHRASES)
+        path = self.config.get("dictionary_path") or os.path.join(get_app_dir(), "phrases.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                phrases.update(json.load(f))
+        self.phrases = {_norm(k): v for k, v in phrases.items()}
+        self.stems = {}
+        for phrase, translation in self.phrases.items():
+            if " " not in phrase:
+                self.stems.setdefault(_stem(phrase), translation)
+
+    def _lookup(self, words) -> Optional[str]:
+        key = " ".join(_norm(w) for w in words)
+        if key in self.phrases:
+            return self.phrases[key]
+        if len(words) == 1:
+            return self.stems.get(_stem(key))
+        return None
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> str:
+        tokens = _TOKEN_RE.findall(text)
+        output = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if not _CYRILLIC_RE.match(token):
+                output.append(token)
+                i += 1
+                continue
+
+            # Words sit at even offsets from here: word, gap, word, gap...
+            for span in range(self.MAX_PHRASE_WORDS, 0, -1):
+                end = i + span * 2 - 1
+                if end > len(tokens):
+                    continue
+                words = tokens[i:end:2]
+                gaps = tokens[i + 1:end:2]
+                if any(gap != " " for gap in gaps) or not all(_CYRILLIC_RE.match(w) for w in words):
+                    continue
+                translation = self._lookup(words)
+                if translation is not None:
+                    if token[:1].isupper():
+                        translation = translation[:1].upper() + translation[1:]
+                    output.append(translation)
+                    i = end
+                    break
+            else:
+                output.append(transliterate(token))
+                i += 1
+        return "".join(output)
+
+
+@register_backend
+class HedgedBackend(TranslationBackend):
+    """Races a secondary provider against a slow primary.
+
+    The primary (`hedge_primary`, default google) is asked first. If it has
+    not answered within the hedge delay, the secondary (`hedge_secondary`,
+    default mymemory) is asked too and the first good answer wins; the
+    loser's answer is discarded. The delay tracks the primary's own p95
+    latency, so only its slowest ~5% of calls are duplicated.
+
+    Answers are cached under the primary's name, and each provider call
+    goes through that provider's own scheduler, so hedged and plain calls
+    share cache entries and throttling state.
+    """
+
+    name = "hedged"
+    MIN_SAMPLES = 20
+
+    def __init__(self, config: Optional[dict] = None, primary: Optional[str] = None, secondary: Optional[str] = None):
+        super().__init__(config)
+        from metrics import Histogram
+
+        primary = primary or self.config.get("hedge_primary", "google")
+        secondary = secondary or self.config.get("hedge_secondary", "mymemory")
+        if self.name in (primary, secondary):
+            raise ValueError("The hedged backend cannot race itself")
+        self.primary = create_backend(primary, self.config)
+        self.secondary = create_backend(secondary, self.config)
+        self.config = dict(self.config, hedge_primary=primary, hedge_secondary=secondary)
+        self.initial_delay = float(self.config.get("hedge_initial_delay", 1.0))
+        self.min_delay = float(self.config.get("hedge_min_delay", 0.05))
+        self.hedged = 0
+        self.secondary_wins = 0
+        self._latency = {self.primary.name: Histogram(), self.secondary.name: Histogram()}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    @classmethod
+    def provider_name(cls, config: dict) -> str:
+        return config.get("hedge_primary", "google")
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            histogram = self._latency[self.primary.name]
+            if len(histogram.recent) < self.MIN_SAMPLES:
+                return self.initial_delay
+            return max(self.min_delay, histogram.percentile(95))
+
+    def latency_summary(self) -> dict:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self._latency.items()}
+
+    def _run(self, backend: TranslationBackend, text: str, priority: int, deadline: Optional[float]) -> str:
+        started = time.perf_counter()
+        result = backend.translate_scheduled(text, priority, deadline)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._latency[backend.name].observe(elapsed)
+        return result
+
+    def _submit(self, backend: TranslationBackend, text: str, priority: int, deadline: Optional[float]):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        return self._pool.submit(self._run, backend, text, priority, deadline)
+
+    def translate(self, text: str, timeout: Optional[float] = None) -> str:
+        from scheduler import Priority
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return self.translate_scheduled(text, Priority.INTERACTIVE, deadline)
+
+    def translate_scheduled(self, text: str, priority: int, deadline: Optional[float] = None) -> str:
+        from concurrent.futures import FIRST_COMPLETED, wait
+        from metrics import METRICS
+
+        primary = self._submit(self.primary, text, priority, deadline)
+        delay = self.hedge_delay()
+        if deadline is not None:
+            delay = min(delay, deadline - time.monotonic())
+        done, _ = wait([primary], timeout=max(delay, 0))
+        if done or len(text) > self.secondary.max_chars:
+            return primary.result()
+        if deadline is not None and deadline <= time.monotonic():
+            return primary.result()  # No budget left for a second request
+
+        with self._lock:
+            self.hedged += 1
+        METRICS.inc("hedge_sent")
+        secondary = self._submit(self.secondary, text, priority, deadline)
+        pending = {primary, secondary}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self._lock:
+                            self.secondary_wins += 1
+                        METRICS.inc("hedge_won")
+                    return future.result()
+        # Both failed: report the primary's error
+        return primary.result()
+
+    def is_transient(self, exc: Exception) -> bool:
+        return self.primary.is_transient(exc) or self.secondary.is_transient(exc)
+
+    def is_throttled(self, exc: Exception) -> bool:
+        return self.primary.is_throttled(exc)
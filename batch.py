@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TextIO, Tuple
+
+from script import needs_translation as _needs_translation
+
+
+class BatchStats:
+    def __init__(self):
+        self.lines = 0
+        self.sent = 0
+        self.duplicates = 0
+        self.english = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def summary(self) -> str:
+        rate = self.lines / self.elapsed if self.elapsed > 0 else 0.0
+        return (
+            f"{self.lines} lines, {self.sent} translated, {self.duplicates} duplicates skipped, "
+            f"{self.english} already English, {self.errors} errors in {self.elapsed:.1f}s ({rate:.1f} lines/s)"
+        )
+
+
+class _Resolved:
+    """Already-resolved stand-in for a future"""
+
+    def __init__(self, value: str):
+        self._value = value
+
+    def done(self) -> bool:
+        return True
+
+    def result(self) -> Tuple[str, str]:
+        return self._value, None
+
+
+def _safe_translate(translate: Callable[[str], str], text: str) -> Tuple[str, str]:
+    try:
+        return translate(text), None
+    except Exception as e:
+        return text, str(e)
+
+
+def translate_ordered(
+    translate: Callable[[str], str],
+    lines: Iterable[str],
+    workers: int = 8,
+    window: int = 0,
+    stats: BatchStats = None,
+    dedupe_size: int = 10000,
+    needs_translation: Callable[[str], bool] = _needs_translation,
+) -> Iterator[Tuple[str, str, str]]:
+    """Translate lines concurrently and yield (source, translation, error) in input order.
+
+    At most `window` lines are held in memory at once, so arbitrarily large
+    inputs run in constant memory. Duplicate lines are never sent twice:
+    repeats inside the window share one future and recent results are kept
+    in a bounded LRU for repeats further apart. Lines for which
+    `needs_translation` is false (already English) are passed through.
+    """
+    window = window or workers * 4
+    stats = stats if stats is not None else BatchStats()
+    pending = deque()
+    inflight = {}
+    recent = OrderedDict()
+
+    def emit():
+        text, future = pending.popleft()
+        translation, error = future.result() if future is not None else (text, None)
+        if future is not None and inflight.get(text) is future:
+            del inflight[text]
+            if error is None:
+                recent[text] = translation
+                if len(recent) > dedupe_size:
+                    recent.popitem(last=False)
+        if error is not None:
+            stats.errors += 1
+        return text, translation, error
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for text in lines:
+            stats.lines += 1
+            future = None
+            if not needs_translation(text):
+                if text.strip():
+                    stats.english += 1
+            elif text in recent:
+                recent.move_to_end(text)
+                stats.duplicates += 1
+                future = _Resolved(recent[text])
+            elif text in inflight:
+                stats.duplicates += 1
+                future = inflight[text]
+            else:
+                stats.sent += 1
+                future = pool.submit(_safe_translate, translate, text)
+                inflight[text] = future
+            pending.append((text, future))
+
+            while pending and (len(pending) >= window or pending[0][1] is None or pending[0][1].done()):
+                yield emit()
+
+        while pending:
+            yield emit()
+
+
+def read_lines(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def run_batch(
+    translate: Callable[[str], str],
+    input_path: str,
+    output_path: str,
+    workers: int = 8,
+    needs_translation: Callable[[str], bool] = _needs_translation,
+) -> BatchStats:
+    stats = BatchStats()
+    with open(output_path, "w", encoding="utf-8") as out:
+        results = translate_ordered(
+            translate, read_lines(input_path), workers=workers, stats=stats, needs_translation=needs_translation
+        )
+        for number, (source, translation, error) in enumerate(results, 1):
+            record = {"line": number, "source": source, "translation": translation}
+            if error is not None:
+                record["error"] = error
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return stats
+
+
+def run_stream(
+    translate: Callable[[str], str],
+    lines: Iterable[str],
+    out: TextIO,
+    workers: int = 8,
+    window: int = 0,
+    errors: TextIO = None,
+    needs_translation: Callable[[str], bool] = _needs_translation,
+) -> BatchStats:
+    """Translate a line stream, writing each result as soon as it and all earlier lines are done.
+
+    Unlike translate_ordered, output does not wait for the next input line,
+    so results keep flowing while the producer on stdin is idle. At most
+    `window` lines are in flight; reading blocks beyond that. If writing to
+    `out` fails (e.g. BrokenPipeError once the reader has gone), reading
+    stops and the error is raised.
+    """
+    window = window or workers * 4
+    errors = errors or sys.stderr
+    stats = BatchStats()
+    slots = threading.BoundedSemaphore(window)
+    ordered = queue.Queue()
+    inflight = {}
+    lock = threading.Lock()
+    stopped = threading.Event()
+    failure = []
+
+    def writer():
+        while True:
+            item = ordered.get()
+            if item is None:
+                return
+            text, future = item
+            translation, error = future.result() if future is not None else (text, None)
+            if future is not None:
+                with lock:
+                    if inflight.get(text) is future:
+                        del inflight[text]
+            if error is not None:
+                stats.errors += 1
+                errors.write(f"Translation error: {error}\n")
+            try:
+                out.write(translation + "\n")
+                out.flush()
+            except (OSError, ValueError) as e:
+                failure.append(e)
+                stopped.set()
+                return
+            slots.release()
+
+    writer_thread = threading.Thread(target=writer, name="stream-writer", daemon=True)
+    writer_thread.start()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for text in lines:
+            # Poll so a writer that has given up cannot leave the reader blocked
+            while not slots.acquire(timeout=0.1):
+                if stopped.is_set():
+                    break
+            if stopped.is_set():
+                break
+            stats.lines += 1
+            future = None
+            if not needs_translation(text):
+                if text.strip():
+                    stats.english += 1
+            else:
+                with lock:
+                    future = inflight.get(text)
+                    if future is None:
+                        stats.sent += 1
+                        future = inflight[text] = pool.submit(_safe_translate, translate, text)
+                    else:
+                        stats.duplicates += 1
+            ordered.put((text, future))
+        ordered.put(None)
+        writer_thread.join()
+    if failure:
+        raise failure[0]
+    return stats
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the prompt compiler against a local mock translation provider.
+
+Run with ``python -m benchmarks.run --out bench.json``.
+"""
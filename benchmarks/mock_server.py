@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockTranslateServer(ThreadingHTTPServer):
+    """Local stand-in for translate.google.com/m and MyMemory's /get.
+
+    Answers with the same HTML shape GoogleBackend parses (or the JSON
+    MyMemoryBackend parses), after a configurable latency. A `tail_rate`
+    share of requests takes `tail_latency` instead, a share fails with 500
+    and requests above `rate_limit` per second are throttled with 429.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.05,
+        jitter=0.02,
+        error_rate=0.0,
+        rate_limit=0.0,
+        tail_rate=0.0,
+        tail_latency=1.0,
+    ):
+        super().__init__((host, port), MockTranslateHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/m"
+
+    @property
+    def mymemory_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/get"
+
+    def start(self) -> "MockTranslateServer":
+        threading.Thread(target=self.serve_forever, name="mock-translate", daemon=True).start()
+        return self
+
+    def admit(self) -> int:
+        """Status code for the next request"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    return 429
+                self._tokens -= 1
+            if self.error_rate > 0 and random.random() < self.error_rate:
+                self.failed += 1
+                return 500
+        return 200
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "throttled": self.throttled, "failed": self.failed}
+
+
+class MockTranslateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        status = server.admit()
+        if server.tail_rate > 0 and random.random() < server.tail_rate:
+            delay = server.tail_latency
+        else:
+            delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        time.sleep(max(0.0, delay))
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        if url.path == "/get":
+            content_type = "application/json"
+            body = json.dumps({
+                "responseData": {"translatedText": f"[en] {query}" if status == 200 else None},
+                "responseStatus": status,
+            })
+        elif status == 200:
+            content_type = "text/html; charset=utf-8"
+            body = f'<html><body><div class="result-container">[en] {html.escape(query)}</div></body></html>'
+        else:
+            content_type = "text/html; charset=utf-8"
+            body = "<html><body>error</body></html>"
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock translation provider")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429 (0 = off)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="share of requests that take --tail-latency")
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = MockTranslateServer(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+    )
+    print(f"Mock translation provider on {server.url} (MyMemory API: {server.mymemory_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
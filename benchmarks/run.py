@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.mock_server import MockTranslateServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SAMPLE_PROMPTS = [
+    "Создай функцию для вычисления факториала числа",
+    "Исправь ошибку в обработчике запросов",
+    "Добавь тесты для модуля авторизации",
+    "Перепиши этот класс с использованием dataclass",
+    "Объясни, что делает этот код",
+    "Оптимизируй запрос к базе данных",
+]
+
+
+def make_prompts(count: int, unique: int):
+    return [f"{SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)]} номер {i % unique}" for i in range(count)]
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, latencies, elapsed: float, errors: int = 0, **extra) -> dict:
+    result = {
+        "scenario": name,
+        "count": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+def peak_rss_kb() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def timed_calls(fn, items):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        try:
+            fn(item)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started, errors
+
+
+def bench_translate(compiler, prompts):
+    compiler.service.cache.clear()
+    cold = summarize("translate_cold", *timed_calls(compiler.translate, prompts))
+    warm = summarize("translate_warm", *timed_calls(compiler.translate, prompts))
+    return [cold, warm]
+
+
+def bench_run_single(compiler, prompts):
+    compiler.service.cache.clear()
+    return [summarize("run_single", *timed_calls(compiler.run_single, prompts))]
+
+
+def bench_batch(compiler, prompts, workers: int, workdir: str):
+    from batch import run_batch
+
+    compiler.service.cache.clear()
+    input_path = os.path.join(workdir, "batch_input.txt")
+    output_path = os.path.join(workdir, "batch_output.jsonl")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(prompts) + "\n")
+
+    # Latency per line sent to the service; duplicates and English lines never reach it
+    latencies = []
+
+    def timed_translate(text):
+        started = time.perf_counter()
+        try:
+            return compiler.service.translate(text)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    stats = run_batch(timed_translate, input_path, output_path, workers=workers)
+    elapsed = time.perf_counter() - started
+    return [summarize(
+        "batch",
+        latencies,
+        elapsed,
+        stats.errors,
+        count=stats.lines,
+        throughput_per_s=round(stats.lines / elapsed, 2) if elapsed > 0 else 0.0,
+        translated=stats.sent,
+        duplicates_skipped=stats.duplicates,
+        already_english=stats.english,
+        workers=workers,
+    )]
+
+
+def bench_hedged(compiler, prompts, secondary_url: str):
+    from backends import HedgedBackend
+    from translation import TranslationService
+
+    config = dict(compiler.service.config, mymemory_url=secondary_url, memory_enabled=False)
+    backend = HedgedBackend(config, primary="google", secondary="mymemory")
+    service = TranslationService(cache=compiler.service.cache, config=config, backend=backend)
+    service.cache.clear()
+    result = summarize("hedged", *timed_calls(service.translate, prompts))
+    result.update(
+        hedge_delay_ms=round(backend.hedge_delay() * 1000, 3),
+        hedged=backend.hedged,
+        secondary_wins=backend.secondary_wins,
+    )
+    return [result]
+
+
+def bench_gui_worker(compiler, prompts):
+    from worker import TranslationWorker
+
+    compiler.service.cache.clear()
+    done = threading.Event()
+    latencies = []
+    errors = []
+    submitted_at = {}
+
+    def on_result(seq, text, result, error):
+        latencies.append(time.perf_counter() - submitted_at[seq])
+        if error is not None:
+            errors.append(error)
+        done.set()
+
+    worker = TranslationWorker(compiler.service.translate, on_result)
+    started = time.perf_counter()
+    for prompt in prompts:
+        done.clear()
+        submitted = time.perf_counter()
+        seq = worker.submit(prompt)
+        submitted_at[seq] = submitted
+        done.wait(30)
+    elapsed = time.perf_counter() - started
+    worker.stop()
+    return [summarize("gui_worker", latencies, elapsed, len(errors), dropped=worker.dropped)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the prompt compiler against a mock provider")
+    parser.add_argument("--out", default="bench_output.json", help="JSON results file")
+    parser.add_argument("--requests", type=int, default=200, help="prompts per scenario")
+    parser.add_argument("--unique", type=int, default=100, help="distinct prompts among them")
+    parser.add_argument("--workers", type=int, default=8, help="batch concurrency")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock provider latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="mock provider requests/s (0 = unlimited)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="share of slow mock provider responses")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="latency of those slow responses")
+    parser.add_argument(
+        "--scenarios",
+        default="translate,run_single,batch,gui_worker",
+        help="comma-separated subset of translate,run_single,batch,gui_worker,hedged",
+    )
+    args = parser.parse_args()
+
+    server = MockTranslateServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+    ).start()
+    # Independent second provider for the hedged scenario, without slow tails
+    secondary = MockTranslateServer(latency=args.latency, jitter=args.jitter).start()
+
+    workdir = tempfile.mkdtemp(prefix="prompt-compiler-bench-")
+    os.environ["PROMPT_COMPILER_HOME"] = workdir
+    with open(os.path.join(workdir, "config.json"), "w", encoding="utf-8") as f:
+        # The prompts differ only in a number, so the fuzzy memory would answer nearly all of them
+        json.dump({"backend": "google", "google_url": server.url, "retry_base_delay": 0.05, "memory_enabled": False}, f)
+
+    from rich.console import Console  # pyright: ignore[reportMissingImports]
+    from main import PromptCompiler
+
+    compiler = PromptCompiler()
+    compiler._console = Console(file=io.StringIO())
+    prompts = make_prompts(args.requests, args.unique)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+
+    results = []
+    for name in scenarios:
+        print(f"Running {name}...", file=sys.stderr)
+        if name == "translate":
+            results.extend(bench_translate(compiler, prompts))
+        elif name == "run_single":
+            results.extend(bench_run_single(compiler, prompts))
+        elif name == "batch":
+            results.extend(bench_batch(compiler, prompts, args.workers, workdir))
+        elif name == "gui_worker":
+            results.extend(bench_gui_worker(compiler, prompts))
+        elif name == "hedged":
+            results.extend(bench_hedged(compiler, prompts, secondary.mymemory_url))
+        else:
+            parser.error(f"unknown scenario: {name}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mock_provider": {
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_limit_per_s": args.rate_limit,
+            "tail_rate": args.tail_rate,
+            "tail_latency_s": args.tail_latency,
+            **server.stats(),
+        },
+        "peak_rss_kb": peak_rss_kb(),
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    server.shutdown()
+    secondary.shutdown()
+
+    for result in results:
+        print(
+            f"{result['scenario']:<16} n={result['count']:<6} "
+            f"{result['throughput_per_s']:>9.1f}/s  "
+            f"p50={result.get('p50_ms', '-')}ms p95={result.get('p95_ms', '-')}ms p99={result.get('p99_ms', '-')}ms",
+            file=sys.stderr,
+        )
+    print(f"Results written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import sys
+
+from userdb import MAX_DOCUMENT_BYTES, shard_key
+
+
+def choose_prefix_length(user_count: int, shard_size: int) -> int:
+    """Smallest hex prefix that keeps the average shard at or below shard_size users"""
+    prefix_length = 1
+    while user_count / (16 ** prefix_length) > shard_size and prefix_length < 8:
+        prefix_length += 1
+    return prefix_length
+
+
+def build_shards(users: dict, output_dir: str, shard_size: int = 200) -> dict:
+    prefix_length = choose_prefix_length(len(users), shard_size)
+    shards = {format(i, "x").zfill(prefix_length): {} for i in range(16 ** prefix_length)}
+    for username, password_hash in users.items():
+        shards[shard_key(username, prefix_length)][username] = password_hash
+
+    shard_dir = os.path.join(output_dir, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    largest = 0
+    # Empty shards are written too, so a missing file always means a server problem
+    for prefix, table in shards.items():
+        data = json.dumps(table, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if len(data) > MAX_DOCUMENT_BYTES:
+            raise ValueError(f"Shard {prefix} is {len(data)} bytes; use a smaller --shard-size")
+        largest = max(largest, len(data))
+        with open(os.path.join(shard_dir, f"{prefix}.json"), "wb") as f:
+            f.write(data)
+
+    manifest = {"version": 1, "prefix_length": prefix_length, "users": len(users)}
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return {"shards": len(shards), "largest_bytes": largest, **manifest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a flat users.json into a sharded user store")
+    parser.add_argument("users_json", help="flat {username: sha256 password hash} file")
+    parser.add_argument("output_dir", help="directory to publish as the users/ folder")
+    parser.add_argument("--shard-size", type=int, default=200, help="target users per shard (default: 200)")
+    args = parser.parse_args()
+
+    with open(args.users_json, "r", encoding="utf-8") as f:
+        users = json.load(f)
+    if not isinstance(users, dict):
+        sys.exit("users.json must be a JSON object")
+
+    summary = build_shards(users, args.output_dir, args.shard_size)
+    print(
+        f"Wrote {summary['shards']} shards for {summary['users']} users "
+        f"(prefix length {summary['prefix_length']}, largest shard {summary['largest_bytes']} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
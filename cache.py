@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from config import get_app_dir, load_config
+
+
+def normalize_key(text: str) -> str:
+    """Collapse whitespace, fold case and treat ё as е"""
+    return " ".join(text.split()).lower().replace("ё", "е")
+
+
+class TranslationCache:
+    """SQLite-backed translation cache with TTL and LRU eviction.
+
+    Recently used entries are mirrored in memory, so repeated prompts are
+    answered without touching the database. Access times are written back
+    lazily together with the next insert.
+    """
+
+    MEMORY_ENTRIES = 1024
+
+    def __init__(self, path: str, max_entries: int = 50000, ttl: float = 30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._touched = {}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "TranslationCache":
+        config = config or load_config()
+        path = config.get("cache_path") or os.path.join(get_app_dir(), "cache.sqlite3")
+        return cls(
+            path,
+            max_entries=int(config.get("cache_max_entries", 50000)),
+            ttl=float(config.get("cache_ttl", 30 * 24 * 3600)),
+        )
+
+    @staticmethod
+    def _key(text: str, namespace: str) -> str:
+        key = normalize_key(text)
+        return f"{namespace}:{key}" if namespace else key
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def get(self, text: str, namespace: str = "") -> Optional[str]:
+        key = self._key(text, namespace)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT value, created FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._expired(entry[1], now):
+                self._delete(key)
+                self.misses += 1
+                return None
+
+            self._touched[key] = now
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text: str, translation: str, namespace: str = ""):
+        key = self._key(text, namespace)
+        now = time.time()
+        with self._lock:
+            existed = key in self._memory or self._conn.execute(
+                "SELECT 1 FROM translations WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, translation, now, now),
+            )
+            self._touched.pop(key, None)
+            self._flush_touches()
+            if not existed:
+                self._count += 1
+            self._remember(key, (translation, now))
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str):
+        self._memory.pop(key, None)
+        self._touched.pop(key, None)
+        cursor = self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+        self._count -= cursor.rowcount
+        self._conn.commit()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE translations SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        # Drop a tenth of the capacity at once so eviction does not run on every insert
+        excess = self._count - self.max_entries + max(1, self.max_entries // 10)
+        if self.ttl > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,)
+            )
+            self._count -= cursor.rowcount
+            excess -= cursor.rowcount
+        if excess > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            self._count -= cursor.rowcount
+        self._memory.clear()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self._memory.clear()
+            self._touched.clear()
+            self._count = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": self._count,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (
+            f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} entries)"
+        )
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import socket
+import sys
+from typing import Optional
+
+from config import get_app_dir, load_config
+
+# Imported by main.py before anything else: keep this module to the standard
+# library bits a one-shot call needs to reach a running daemon.
+
+DAEMON_SOCKET = "daemon.sock"
+
+
+def socket_path(config: Optional[dict] = None) -> str:
+    config = config or load_config()
+    return config.get("daemon_socket") or os.path.join(get_app_dir(), DAEMON_SOCKET)
+
+
+def _terminal() -> dict:
+    """Width and colour support of stdout, so the daemon renders exactly what rich would here"""
+    color = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+    try:
+        width = os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        width = int(os.environ.get("COLUMNS") or 80)
+    return {"width": width, "color": color}
+
+
+def request(text: str, config: Optional[dict] = None) -> Optional[dict]:
+    """Translate and render text in the daemon; None when no daemon answers"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    config = config or load_config()
+    path = socket_path(config)
+    if not os.path.exists(path):
+        return None
+    message = dict(_terminal(), text=text)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.5)
+            sock.connect(path)
+            sock.settimeout(float(config.get("daemon_timeout", 120)))
+            sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reply:
+                response = json.loads(reply.readline().decode("utf-8"))
+    except (OSError, ValueError):
+        return None  # Stale socket, daemon gone or timed out
+    if not isinstance(response, dict) or "output" not in response:
+        return None
+    return response
+
+
+def forward(argv) -> bool:
+    """Handle a plain `main.py "текст"` call through a running daemon.
+
+    Anything with options, and calls with no daemon to answer, return False
+    and run in-process as usual.
+    """
+    if not argv or argv == ["gui"] or any(arg.startswith("-") for arg in argv):
+        return False
+    response = request(" ".join(argv))
+    if response is None:
+        return False
+    sys.stdout.write(response["output"])
+    sys.stdout.flush()
+    return True
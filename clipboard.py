@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from typing import Callable, Optional
+
+from scheduler import Priority
+from worker import TranslationWorker
+
+
+_UNSET = object()
+
+
+class ClipboardWatcher:
+    """Speculative pre-translation of Russian text copied to the clipboard.
+
+    `poll` is called periodically from the thread that owns the clipboard
+    (the Tk thread) and reads it with `read`. Text that stays on the
+    clipboard for `debounce` seconds, needs translating and is at most
+    `max_chars` long is translated on a background worker at
+    Priority.BACKGROUND, so the result is in the cache by the time it is
+    pasted. Speculative calls start at most once per `min_interval`
+    seconds, and newer clipboard text replaces a request still waiting.
+    Whatever was on the clipboard when watching began is left alone.
+
+    `on_result(text, translation, error)` is called on the worker thread.
+    """
+
+    def __init__(
+        self,
+        service,
+        read: Callable[[], Optional[str]],
+        on_result: Optional[Callable] = None,
+        debounce: float = 1.0,
+        min_interval: float = 3.0,
+        max_chars: int = 5000,
+    ):
+        self.service = service
+        self.read = read
+        self.on_result = on_result
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_chars = max_chars
+        self.speculated = 0
+        self.skipped = 0
+        self._seen = _UNSET
+        self._changed = 0.0
+        self._handled = None
+        self._last_call = float("-inf")
+        self.worker = TranslationWorker(self._translate, self._on_worker_result)
+
+    @classmethod
+    def from_config(cls, service, read: Callable[[], Optional[str]], on_result: Optional[Callable] = None):
+        config = service.config
+        return cls(
+            service,
+            read,
+            on_result,
+            debounce=float(config.get("watch_debounce", 1.0)),
+            min_interval=float(config.get("watch_min_interval", 3.0)),
+            max_chars=int(config.get("watch_max_chars", 5000)),
+        )
+
+    def _translate(self, text: str) -> str:
+        return self.service.translate(text, priority=Priority.BACKGROUND)
+
+    def _on_worker_result(self, seq: int, text: str, translation: str, error: Exception):
+        if self.on_result is not None:
+            self.on_result(text, translation, error)
+
+    def poll(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        text = self.read()
+        if text is None:
+            return
+        text = text.strip()
+        if self._seen is _UNSET:
+            self._seen = self._handled = text
+            return
+        if text != self._seen:
+            self._seen = text
+            self._changed = now
+            return
+        if text == self._handled or now - self._changed < self.debounce:
+            return
+        if now - self._last_call < self.min_interval:
+            return  # Rate limited; a later poll picks it up
+        self._handled = text
+        if not text or len(text) > self.max_chars or not self.service.needs_translation(text):
+            self.skipped += 1
+            return
+        self._last_call = now
+        self.speculated += 1
+        self.worker.submit(text)
+
+    def stop(self):
+        self.worker.stop()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+
+APP_DIR_ENV = "PROMPT_COMPILER_HOME"
+CONFIG_FILE = "config.json"
+
+DEFAULTS = {
+    "cache_enabled": True,
+    "cache_path": None,
+    "cache_ttl": 30 * 24 * 3600,
+    "cache_max_entries": 50000,
+}
+
+
+def get_app_dir() -> str:
+    """Directory for the config file, cache and other local state"""
+    path = os.environ.get(APP_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".prompt_compiler")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def load_config() -> dict:
+    config = dict(DEFAULTS)
+    path = os.path.join(get_app_dir(), CONFIG_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            user_config = json.load(f)
+        if isinstance(user_config, dict):
+            config.update(user_config)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError):
+        pass  # Broken config falls back to defaults
+    return config
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import socket
+from socketserver import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+
+from client import socket_path
+from metrics import METRICS
+
+
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class TranslationDaemon(ThreadingMixIn, UnixStreamServer):
+    """Resident PromptCompiler answering the thin client in client.py.
+
+    Keeps the compiler, its cache, translation memory and pooled provider
+    connections warm between calls. Each connection carries one JSON line
+    in ({"text", "width", "color"}) and one out ({"translation", "output"});
+    `output` is the CLI panel already rendered for the caller's terminal,
+    so the client never imports rich.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, compiler, path: str):
+        self.compiler = compiler
+        self.path = path
+        if os.path.exists(path):
+            if _answers(path):
+                raise OSError(f"a daemon is already listening on {path}")
+            os.unlink(path)  # Left behind by a daemon that did not exit cleanly
+        super().__init__(path, DaemonRequestHandler)
+        os.chmod(path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _answers(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+class DaemonRequestHandler(StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+        try:
+            if len(line) > MAX_REQUEST_BYTES:
+                raise ValueError("request too large")
+            message = json.loads(line.decode("utf-8"))
+            if not isinstance(message, dict) or not isinstance(message.get("text"), str):
+                raise ValueError("expected a JSON object with 'text'")
+        except ValueError as e:
+            self._reply({"error": str(e)})
+            return
+        with METRICS.stage("daemon_request"):
+            self._reply(self._run(message))
+
+    def _run(self, message: dict) -> dict:
+        from rich.console import Console  # pyright: ignore[reportMissingImports]
+
+        color = bool(message.get("color"))
+        buffer = io.StringIO()
+        console = Console(
+            file=buffer,
+            width=int(message.get("width") or 80),
+            force_terminal=color,
+            color_system="standard" if color else None,
+        )
+        translation = self.server.compiler.run_single(message["text"], console=console)
+        return {"translation": translation, "output": buffer.getvalue()}
+
+    def _reply(self, payload: dict):
+        try:
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError:
+            pass  # Client gave up
+
+
+def serve_daemon(compiler, path: str = None):
+    path = path or socket_path(compiler.service.config)
+    server = TranslationDaemon(compiler, path)
+    # Build the provider and open the history store up front, not on the first request
+    compiler.service.backend
+    compiler.history
+    compiler.console.print(
+        f"[bold magenta]Prompt Compiler daemon[/bold magenta] on {path} [dim](Ctrl+C to stop)[/dim]"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import difflib
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import threading
-from deep_translator import GoogleTranslator  # pyright: ignore[reportMissingImports]
+
+from metrics import METRICS
+from clipboard import ClipboardWatcher
+from history import HistoryStore
+from segmenter import split_sentences
+from translation import TranslationService
+from worker import TranslationWorker
 
 
 class PromptCompilerGUI:
@@ -23,18 +31,56 @@ class PromptCompilerGUI:
     SUCCESS_GREEN = "#3fb950"  # Success green
     ERROR_RED = "#f85149"  # Error red
     
+    LIVE_DEBOUNCE_MS = 600  # Pause in typing before a live translation starts
+    OUTPUT_CHUNK_CHARS = 8000  # Most text inserted into the output pane per Tk tick
+    OUTPUT_TICK_MS = 15
+    HISTORY_PAGE = 200  # History rows fetched at a time as the list scrolls
+    HISTORY_DEBOUNCE_MS = 250
+    CLIPBOARD_POLL_MS = 500
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Prompt Compiler for Cursor")
         self.root.geometry("900x700")
         self.root.resizable(True, True)
         self.pinned = False
+        self.session_revoked = False
+        
+        # Live mode state: sentence pieces currently shown and their output text
+        self.live_var = tk.BooleanVar(value=False)
+        self._live_after = None
+        self._live_pieces = None
+        self._live_outputs = []
+        self._live_job = None
+        
+        # Clipboard watcher state: speculative translations warm the cache
+        self.watch_var = tk.BooleanVar(value=False)
+        self.clipboard_watcher = None
+        
+        # Streamed output: pieces arrive from the worker thread through a queue
+        # and are inserted in bounded chunks; the full result is kept in memory
+        self._output_queue = queue.Queue()
+        self._output_backlog = ""
+        self._output_seq = None
+        self._output_string = ""
+        self._draining = False
         
         # Configure midnight theme
         self.setup_theme()
         
-        # Initialize translator
-        self.translator = GoogleTranslator(source='ru', target='en')
+        # Initialize translator (reads through the shared on-disk cache)
+        self.service = TranslationService()
+        self.worker = TranslationWorker(self._translate_streaming, self._on_worker_result)
+        self.history = None
+        if self.service.config.get("history_enabled", True):
+            self.history = HistoryStore.from_config(self.service.config)
+        self.history_window = None
+        self.service.resilience.add_retry_listener(
+            lambda attempt, attempts, delay, error: self.root.after(0, self._show_retry, attempt, attempts, delay)
+        )
+        self.service.resilience.breaker.add_listener(
+            lambda state: self.root.after(0, self._show_provider_state, state)
+        )
         
         # Setup UI
         self.setup_ui()
@@ -116,6 +162,20 @@ class PromptCompilerGUI:
             'Dark.TButton',
             background=[('active', self.BUTTON_HOVER), ('pressed', self.BG_TERTIARY)]
         )
+        
+        # Checkbutton styles
+        self.style.configure(
+            'Dark.TCheckbutton',
+            background=self.BG_DARK,
+            foreground=self.TEXT_PRIMARY,
+            focuscolor='none',
+            font=("Segoe UI", 10)
+        )
+        self.style.map(
+            'Dark.TCheckbutton',
+            background=[('active', self.BG_DARK)],
+            indicatorcolor=[('selected', self.ACCENT_CYAN), ('!selected', self.BG_TERTIARY)]
+        )
     
     def center_window(self):
         self.root.update_idletasks()
@@ -222,6 +282,26 @@ class PromptCompilerGUI:
         )
         self.pin_button.pack(side=tk.LEFT, padx=8)
         
+        # Live translate-as-you-type toggle
+        live_check = ttk.Checkbutton(
+            buttons_frame,
+            text="⚡ Live",
+            variable=self.live_var,
+            command=self.toggle_live,
+            style="Dark.TCheckbutton"
+        )
+        live_check.pack(side=tk.LEFT, padx=8)
+        
+        # Clipboard watcher toggle
+        watch_check = ttk.Checkbutton(
+            buttons_frame,
+            text="📋 Watch clipboard",
+            variable=self.watch_var,
+            command=self.toggle_watch,
+            style="Dark.TCheckbutton"
+        )
+        watch_check.pack(side=tk.LEFT, padx=8)
+        
         # Output section
         output_frame = ttk.LabelFrame(
             main_frame,
@@ -272,6 +352,33 @@ class PromptCompilerGUI:
         )
         copy_button.pack(side=tk.LEFT, padx=8)
         
+        # Diagnostics button
+        diagnostics_button = ttk.Button(
+            copy_frame,
+            text="📊 Diagnostics",
+            command=self.show_diagnostics,
+            style="Dark.TButton"
+        )
+        diagnostics_button.pack(side=tk.LEFT, padx=8)
+        
+        # Translation memory button
+        similar_button = ttk.Button(
+            copy_frame,
+            text="🔎 Similar",
+            command=self.show_similar,
+            style="Dark.TButton"
+        )
+        similar_button.pack(side=tk.LEFT, padx=8)
+        
+        # Translation history button
+        history_button = ttk.Button(
+            copy_frame,
+            text="🕘 History",
+            command=self.show_history,
+            style="Dark.TButton"
+        )
+        history_button.pack(side=tk.LEFT, padx=8)
+        
         # Status label with icon
         status_frame = ttk.Frame(main_frame, style='Dark.TFrame')
         status_frame.grid(row=5, column=0, pady=10)
@@ -286,6 +393,7 @@ class PromptCompilerGUI:
         # Bind Enter key (Ctrl+Enter for multiline)
         self.input_text.bind('<Control-Return>', lambda e: self.translate_text())
         self.root.bind('<Control-Return>', lambda e: self.translate_text())
+        self.input_text.bind('<<Modified>>', self._on_input_modified)
         
         # Configure scrollbar colors
         self._style_scrollbars()
@@ -307,44 +415,132 @@ class PromptCompilerGUI:
             messagebox.showwarning("Warning", "Please enter text to translate")
             return
         
-        # Disable button and show status
-        self.translate_button.config(state=tk.DISABLED)
+        # Show status; the button stays enabled so a new request can supersede this one
         self.status_label.config(text="⏳ Translating...", foreground=self.ACCENT_CYAN)
-        self.root.update()
         
-        # Run translation in background thread
-        thread = threading.Thread(target=self._translate_thread, args=(russian_text,))
-        thread.daemon = True
-        thread.start()
+        # Hand over to the background worker; stale requests never reach the output
+        self.worker.submit(russian_text)
+        self._start_draining()
     
-    def _translate_thread(self, russian_text: str):
+    def _translate_streaming(self, russian_text: str) -> str:
+        # Runs on the worker thread: hand each finished piece to the Tk thread as it comes
+        seq = self.worker.running()
+        self._output_queue.put((seq, None))
+        parts = []
+        pieces = self.service.translate_pieces(russian_text)
         try:
-            english_text = self.translator.translate(russian_text)
-            
-            # Update UI
-            self.root.after(0, self._update_output, english_text, None)
-        except Exception as e:
-            error_msg = f"Translation error: {str(e)}"
-            self.root.after(0, self._update_output, None, error_msg)
-    
-    def _update_output(self, english_text: str = None, error: str = None):
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete("1.0", tk.END)
+            for piece in pieces:
+                if not self.worker.is_current(seq):
+                    break  # Superseded; the rest would be dropped anyway
+                parts.append(piece)
+                self._output_queue.put((seq, piece))
+        finally:
+            pieces.close()  # Cancels the segments not yet sent
+        return "".join(parts)
+    
+    def _start_draining(self):
+        if not self._draining:
+            self._draining = True
+            self.root.after(self.OUTPUT_TICK_MS, self._drain_output)
+    
+    def _drain_output(self):
+        """Move at most OUTPUT_CHUNK_CHARS of streamed text into the pane, then yield to Tk"""
+        while len(self._output_backlog) < self.OUTPUT_CHUNK_CHARS:
+            try:
+                seq, piece = self._output_queue.get_nowait()
+            except queue.Empty:
+                break
+            if not self.worker.is_current(seq):
+                continue
+            if piece is None:
+                # A new result starts: the pane and live mode start from scratch
+                self._output_seq = seq
+                self._output_backlog = ""
+                self._output_string = ""
+                self._live_pieces = None
+                self.output_text.config(state=tk.NORMAL)
+                self.output_text.delete("1.0", tk.END)
+                self.output_text.config(state=tk.DISABLED)
+            elif seq == self._output_seq:
+                self._output_backlog += piece
+                self._output_string += piece  # Copy takes what is streaming, not the last result
+        
+        if self._output_backlog:
+            chunk = self._output_backlog[:self.OUTPUT_CHUNK_CHARS]
+            self._output_backlog = self._output_backlog[self.OUTPUT_CHUNK_CHARS:]
+            self.output_text.config(state=tk.NORMAL)
+            self.output_text.insert(tk.END, chunk)
+            self.output_text.config(state=tk.DISABLED)
+        
+        # busy() before empty(): the worker queues its last piece before it stops being busy
+        if self._output_backlog or self.worker.busy() or not self._output_queue.empty():
+            self.root.after(self.OUTPUT_TICK_MS, self._drain_output)
+        else:
+            self._draining = False
+    
+    def _on_worker_result(self, seq: int, russian_text: str, english_text: str, error: Exception):
+        # Runs on the worker thread
+        if error is not None:
+            error_msg = f"Translation error: {str(error)}"
+            self.root.after(0, self._update_output, None, error_msg, seq)
+        else:
+            if self.history is not None:
+                self.history.record(russian_text, english_text, "gui")
+            self.root.after(0, self._update_output, english_text, None, seq)
+    
+    def _discard_stream(self):
+        """Drop streamed text not yet shown, along with the in-memory result"""
+        while True:
+            try:
+                self._output_queue.get_nowait()
+            except queue.Empty:
+                break
+        self._live_pieces = None
+        self._output_seq = None
+        self._output_backlog = ""
+        self._output_string = ""
+    
+    def _update_output(self, english_text: str = None, error: str = None, seq: int = None):
+        if seq is not None and not self.worker.is_current(seq):
+            return  # Superseded while waiting for the Tk thread
         
         if error:
+            # Replace whatever was streamed so far with the error
+            self._discard_stream()
+            self.output_text.config(state=tk.NORMAL)
+            self.output_text.delete("1.0", tk.END)
             self.output_text.insert("1.0", error)
             self.output_text.tag_add("error", "1.0", tk.END)
             self.output_text.tag_config("error", foreground=self.ERROR_RED)
-            self.status_label.config(text="❌ Error occurred", foreground=self.ERROR_RED)
+            self.output_text.config(state=tk.DISABLED)
+            self.status_label.config(
+                text=f"❌ Error occurred · {self.service.provider_status()}",
+                foreground=self.ERROR_RED
+            )
         else:
-            self.output_text.insert("1.0", english_text)
-            self.status_label.config(text="✅ Translation complete", foreground=self.SUCCESS_GREEN)
-        
-        self.output_text.config(state=tk.DISABLED)
-        self.translate_button.config(state=tk.NORMAL)
+            # The text itself has been streamed into the pane by _drain_output
+            self._output_string = english_text
+            self.status_label.config(
+                text=f"✅ Translation complete · {self.service.cache_stats()}",
+                foreground=self.SUCCESS_GREEN
+            )
+    
+    def _show_retry(self, attempt: int, attempts: int, delay: float):
+        self.status_label.config(
+            text=f"🔁 Provider error, retrying in {delay:.1f}s (attempt {attempt + 1}/{attempts})...",
+            foreground=self.ACCENT_CYAN
+        )
+    
+    def _show_provider_state(self, state: str):
+        color = self.SUCCESS_GREEN if state == "closed" else self.ERROR_RED
+        self.status_label.config(text=f"● Translation {self.service.provider_status()}", foreground=color)
     
     def copy_to_clipboard(self):
-        english_text = self.output_text.get("1.0", tk.END).strip()
+        # The result is already in memory; no need to read it back out of the widget
+        if self._live_pieces is not None:
+            english_text = "".join(self._live_outputs).strip()
+        else:
+            english_text = self._output_string.strip()
         
         if not english_text:
             messagebox.showwarning("Warning", "No text to copy")
@@ -357,7 +553,336 @@ class PromptCompilerGUI:
         # Reset status after 2 seconds
         self.root.after(2000, lambda: self.status_label.config(text="● Ready", foreground=self.TEXT_SECONDARY))
     
+    def toggle_live(self):
+        """Toggle translate-as-you-type"""
+        if self.live_var.get():
+            self.status_label.config(text="⚡ Live translation on", foreground=self.ACCENT_CYAN)
+            self._schedule_live()
+        else:
+            if self._live_after is not None:
+                self.root.after_cancel(self._live_after)
+                self._live_after = None
+            self.status_label.config(text="● Live translation off", foreground=self.TEXT_SECONDARY)
+    
+    def _on_input_modified(self, event=None):
+        if not self.input_text.edit_modified():
+            return
+        self.input_text.edit_modified(False)
+        if self.live_var.get():
+            self._schedule_live()
+    
+    def _schedule_live(self):
+        # Debounce: restart the countdown on every keystroke
+        if self._live_after is not None:
+            self.root.after_cancel(self._live_after)
+        self._live_after = self.root.after(self.LIVE_DEBOUNCE_MS, self._live_translate)
+    
+    def _live_translate(self):
+        self._live_after = None
+        pieces = split_sentences(self.input_text.get("1.0", "end-1c"))
+        matcher = difflib.SequenceMatcher(None, self._live_pieces or [], pieces, autojunk=False)
+        opcodes = [op for op in matcher.get_opcodes() if op[0] != 'equal']
+        if not opcodes and self._live_pieces is not None:
+            return
+        
+        self._live_job = (pieces, opcodes)
+        changed = tuple(dict.fromkeys(
+            piece
+            for _, _, _, j1, j2 in opcodes
+            for piece, translatable in pieces[j1:j2]
+            if translatable
+        ))
+        if not changed:
+            # Only deletions or whitespace changed: patch right away
+            self.worker.cancel()
+            self._apply_live_patch(None, {}, None)
+            return
+        
+        self.status_label.config(
+            text=f"⏳ Live: translating {len(changed)} sentence(s)...",
+            foreground=self.ACCENT_CYAN
+        )
+        self.worker.submit(
+            changed,
+            translate=self.service.translate_segments,
+            on_result=lambda seq, text, result, error: self.root.after(
+                0, self._apply_live_patch, seq, result, error
+            )
+        )
+    
+    def _apply_live_patch(self, seq, translations: dict, error: Exception):
+        if seq is not None and not self.worker.is_current(seq):
+            return
+        if error is not None:
+            self.status_label.config(text=f"❌ Live translation error: {error}", foreground=self.ERROR_RED)
+            return
+        
+        pieces, opcodes = self._live_job
+        self.output_text.config(state=tk.NORMAL)
+        if self._live_pieces is None:
+            self.output_text.delete("1.0", tk.END)
+            self._live_outputs = []
+        outputs = self._live_outputs
+        
+        # Patch from the end so earlier character offsets stay valid
+        for _, i1, i2, j1, j2 in reversed(opcodes):
+            start = sum(len(text) for text in outputs[:i1])
+            end = start + sum(len(text) for text in outputs[i1:i2])
+            replacement = [
+                translations.get(piece, piece) if translatable else piece
+                for piece, translatable in pieces[j1:j2]
+            ]
+            self.output_text.delete(f"1.0 + {start} chars", f"1.0 + {end} chars")
+            self.output_text.insert(f"1.0 + {start} chars", "".join(replacement))
+            outputs[i1:i2] = replacement
+        
+        self.output_text.config(state=tk.DISABLED)
+        self._live_pieces = pieces
+        self.status_label.config(
+            text=f"⚡ Live: updated {len(translations)} sentence(s)",
+            foreground=self.SUCCESS_GREEN
+        )
+    
+    def toggle_watch(self):
+        """Pre-translate Russian text as it is copied, so pasting finds it cached"""
+        if self.clipboard_watcher is not None:
+            self.clipboard_watcher.stop()
+            self.clipboard_watcher = None
+        if self.watch_var.get():
+            self.clipboard_watcher = ClipboardWatcher.from_config(
+                self.service,
+                self._read_clipboard,
+                lambda text, translation, error: self.root.after(0, self._show_speculated, error)
+            )
+            self.status_label.config(text="📋 Watching the clipboard", foreground=self.ACCENT_CYAN)
+            self._poll_clipboard()
+        else:
+            self.status_label.config(text="● Ready", foreground=self.TEXT_SECONDARY)
+    
+    def _read_clipboard(self):
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return None  # Empty, or not text
+    
+    def _poll_clipboard(self):
+        if self.clipboard_watcher is None:
+            return
+        self.clipboard_watcher.poll()
+        self.root.after(self.CLIPBOARD_POLL_MS, self._poll_clipboard)
+    
+    def _show_speculated(self, error: Exception):
+        # Do not talk over a translation the user is waiting for
+        if error is None and not self.worker.busy():
+            self.status_label.config(
+                text="📋 Clipboard text pre-translated; paste and press Ctrl+Enter",
+                foreground=self.SUCCESS_GREEN
+            )
+    
+    def show_diagnostics(self):
+        """Open a small window with recent translation latencies"""
+        if getattr(self, "diagnostics_window", None) is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        
+        self.diagnostics_window = tk.Toplevel(self.root)
+        self.diagnostics_window.title("Diagnostics")
+        self.diagnostics_window.geometry("520x360")
+        self.diagnostics_window.configure(bg=self.BG_DARK)
+        self.diagnostics_text = tk.Text(
+            self.diagnostics_window,
+            font=("Consolas", 10),
+            bg=self.INPUT_BG,
+            fg=self.TEXT_PRIMARY,
+            relief=tk.FLAT,
+            borderwidth=0,
+            padx=12,
+            pady=12,
+            highlightthickness=0
+        )
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True)
+        self._refresh_diagnostics()
+    
+    def _refresh_diagnostics(self):
+        if not self.diagnostics_window.winfo_exists():
+            return
+        
+        recent = METRICS.recent("translate")[-10:]
+        snapshot = METRICS.snapshot()
+        lines = [METRICS.format_table(), ""]
+        lines.append("Recent translations (ms): " + ", ".join(f"{s * 1000:.1f}" for s in recent))
+        lines.append("Events: " + ", ".join(f"{k}={v}" for k, v in snapshot["counters"].items()))
+        lines.append(self.service.cache_stats())
+        if self.service.memory is not None:
+            lines.append(self.service.memory.format_stats())
+        lines.append(f"Provider: {self.service.provider_status()}")
+        lines.append(self.service.scheduler.describe())
+        
+        self.diagnostics_text.config(state=tk.NORMAL)
+        self.diagnostics_text.delete("1.0", tk.END)
+        self.diagnostics_text.insert("1.0", "\n".join(lines))
+        self.diagnostics_text.config(state=tk.DISABLED)
+        self.diagnostics_window.after(1000, self._refresh_diagnostics)
+    
+    def show_similar(self):
+        """List past translations similar to the current input"""
+        russian_text = self.input_text.get("1.0", tk.END).strip()
+        if not russian_text:
+            messagebox.showwarning("Warning", "Please enter text to search for")
+            return
+        
+        matches = self.service.similar(russian_text)
+        window = tk.Toplevel(self.root)
+        window.title("Similar translations")
+        window.geometry("640x400")
+        window.configure(bg=self.BG_DARK)
+        text = scrolledtext.ScrolledText(
+            window,
+            wrap=tk.WORD,
+            font=("Segoe UI", 10),
+            bg=self.INPUT_BG,
+            fg=self.TEXT_PRIMARY,
+            relief=tk.FLAT,
+            borderwidth=0,
+            padx=12,
+            pady=12,
+            highlightthickness=0
+        )
+        text.pack(fill=tk.BOTH, expand=True)
+        if not matches:
+            text.insert("1.0", "No similar translations in memory.")
+        for match in matches:
+            text.insert(tk.END, f"{match['score']:.0%}  {match['source']}\n      {match['translation']}\n\n")
+        text.config(state=tk.DISABLED)
+    
+    def show_history(self):
+        """Searchable list of past translations, loaded a page at a time as it scrolls"""
+        if self.history is None:
+            messagebox.showinfo("History", "History is disabled (history_enabled is false)")
+            return
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
+        
+        self.history_window = tk.Toplevel(self.root)
+        self.history_window.title("History")
+        self.history_window.geometry("760x480")
+        self.history_window.configure(bg=self.BG_DARK)
+        self._history_entries = []
+        self._history_done = True  # Until the first search
+        self._history_loading = False
+        
+        search_frame = ttk.Frame(self.history_window, style='Dark.TFrame')
+        search_frame.pack(fill=tk.X, padx=8, pady=8)
+        self.history_query = tk.StringVar()
+        search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.history_query,
+            font=("Segoe UI", 11),
+            bg=self.INPUT_BG,
+            fg=self.TEXT_PRIMARY,
+            insertbackground=self.ACCENT_CYAN,
+            relief=tk.FLAT,
+            highlightthickness=0
+        )
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.history_count_label = ttk.Label(search_frame, text="", style="Status.TLabel")
+        self.history_count_label.pack(side=tk.LEFT, padx=8)
+        
+        list_frame = ttk.Frame(self.history_window, style='Dark.TFrame')
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
+        self.history_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.history_list = tk.Listbox(
+            list_frame,
+            font=("Segoe UI", 10),
+            bg=self.INPUT_BG,
+            fg=self.TEXT_PRIMARY,
+            selectbackground=self.ACCENT_CYAN,
+            selectforeground="#ffffff",
+            relief=tk.FLAT,
+            borderwidth=0,
+            highlightthickness=0,
+            activestyle="none",
+            yscrollcommand=self._on_history_scroll
+        )
+        self.history_scrollbar.config(command=self.history_list.yview)
+        self.history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.history_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.history_list.bind('<Double-Button-1>', self._open_history_entry)
+        self.history_list.bind('<Return>', self._open_history_entry)
+        self._history_after = None
+        self.history_query.trace_add("write", self._schedule_history_search)
+        self._search_history()
+        search_entry.focus()
+    
+    def _schedule_history_search(self, *args):
+        if self._history_after is not None:
+            self.history_window.after_cancel(self._history_after)
+        self._history_after = self.history_window.after(self.HISTORY_DEBOUNCE_MS, self._search_history)
+    
+    def _search_history(self):
+        self._history_after = None
+        query = self.history_query.get().strip()
+        self._history_entries = []
+        self._history_done = False
+        self._history_loading = False
+        self.history_list.delete(0, tk.END)
+        self._load_history_page()
+        total = self.history.count(query)
+        self.history_count_label.config(text=f"{total} translation(s)")
+    
+    def _load_history_page(self):
+        """Append the next page of matches; the list only ever holds what was scrolled to"""
+        self._history_loading = False
+        if self._history_done or not self.history_window.winfo_exists():
+            return
+        before = self._history_entries[-1]["id"] if self._history_entries else None
+        entries = self.history.search(self.history_query.get().strip(), limit=self.HISTORY_PAGE, before=before)
+        self._history_done = len(entries) < self.HISTORY_PAGE
+        self._history_entries.extend(entries)
+        rows = []
+        for entry in entries:
+            when = time.strftime("%m-%d %H:%M", time.localtime(entry["created"]))
+            line = f"{when}  {entry['source']}  →  {entry['translation']}"
+            rows.append(" ".join(line.split())[:300])
+        if rows:
+            self.history_list.insert(tk.END, *rows)
+    
+    def _on_history_scroll(self, first, last):
+        self.history_scrollbar.set(first, last)
+        # Fetch the next page before the end of the loaded rows comes into view
+        if float(last) > 0.9 and not self._history_done and not self._history_loading:
+            self._history_loading = True
+            self.history_window.after_idle(self._load_history_page)
+    
+    def _open_history_entry(self, event=None):
+        """Put a past translation back into the input and output panes"""
+        selection = self.history_list.curselection()
+        if not selection:
+            return
+        entry = self._history_entries[selection[0]]
+        self.worker.cancel()
+        self._discard_stream()
+        self.input_text.delete("1.0", tk.END)
+        self.input_text.insert("1.0", entry["source"])
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.insert("1.0", entry["translation"])
+        self.output_text.config(state=tk.DISABLED)
+        self._output_string = entry["translation"]
+        self.status_label.config(text="🕘 Loaded from history", foreground=self.TEXT_SECONDARY)
+    
+    def end_session(self):
+        """The login behind this window was revoked: close it so main() asks again"""
+        self.session_revoked = True
+        self.worker.cancel()
+        messagebox.showwarning("Session ended", "Your login is no longer valid. Please log in again.")
+        self.root.destroy()
+    
     def clear_all(self):
+        self.worker.cancel()
+        self._discard_stream()
         self.input_text.delete("1.0", tk.END)
         self.output_text.config(state=tk.NORMAL)
         self.output_text.delete("1.0", tk.END)
@@ -398,9 +923,21 @@ class PromptCompilerGUI:
 
 
 def main():
-    root = tk.Tk()
-    app = PromptCompilerGUI(root)
-    root.mainloop()
+    from auth import revalidate_session, show_login
+    from session import SessionStore
+    
+    while True:
+        # A valid session token opens the main window at once, without the network
+        session = SessionStore.from_config().verify()
+        if session is None and not show_login():
+            return
+        root = tk.Tk()
+        app = PromptCompilerGUI(root)
+        if session is not None:
+            revalidate_session(session, lambda: root.after(0, app.end_session))
+        root.mainloop()
+        if not app.session_revoked:
+            return
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from config import get_app_dir, load_config
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HistoryStore:
+    """Append-only record of past translations, searchable in both languages.
+
+    Entries live in SQLite with an FTS5 index over the Russian and English
+    text (plain LIKE matching where SQLite was built without FTS5).
+    `record` only queues the entry; a writer thread inserts queued entries
+    in batches, so translating never waits for the disk. Lists are read
+    newest first in pages keyed by id, which stays fast however long the
+    history grows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, created REAL NOT NULL, mode TEXT NOT NULL, "
+            "source TEXT NOT NULL, translation TEXT NOT NULL)"
+        )
+        try:
+            # Contentless index: the text lives in `history`; ё is folded into е
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                "source, translation, content='', tokenize='unicode61 remove_diacritics 2')"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN "
+                "INSERT INTO history_fts (rowid, source, translation) VALUES (new.id, "
+                "replace(replace(new.source, 'ё', 'е'), 'Ё', 'Е'), new.translation); END"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite without FTS5
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "HistoryStore":
+        config = config or load_config()
+        return cls(config.get("history_path") or os.path.join(get_app_dir(), "history.sqlite3"))
+
+    def record(self, source: str, translation: str, mode: str = "cli"):
+        """Queue an entry; returns at once"""
+        self._queue.put((time.time(), mode, source, translation))
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._insert(batch)
+                    return
+                batch.append(entry)
+            self._insert(batch)
+
+    def _insert(self, batch: list):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO history (created, mode, source, translation) VALUES (?, ?, ?, ?)", batch
+            )
+            self._conn.commit()
+
+    def _matching(self, query: str, before: Optional[int] = None):
+        """SQL selecting matching ids (newest first) and its parameters; None for everything"""
+        words = _WORD_RE.findall(query.replace("ё", "е").replace("Ё", "Е"))
+        if not words:
+            if before is None:
+                return None, []
+            return "SELECT id FROM history WHERE id < ? ORDER BY id DESC", [before]
+        if self.fts:
+            # Every word must match, as a prefix, in either language
+            sql = "SELECT rowid AS id FROM history_fts WHERE history_fts MATCH ?"
+            params = [" ".join(f'"{word}"*' for word in words)]
+        else:
+            sql = "SELECT id FROM history WHERE " + " AND ".join(
+                "(source LIKE ? OR translation LIKE ?)" for _ in words
+            )
+            params = [pattern for word in words for pattern in (f"%{word}%", f"%{word}%")]
+        if before is not None:
+            sql += f" AND {'rowid' if self.fts else 'id'} < ?"
+            params.append(before)
+        return sql + f" ORDER BY {'rowid' if self.fts else 'id'} DESC", params
+
+    def search(self, query: str = "", limit: int = 100, before: Optional[int] = None) -> List[dict]:
+        """Entries matching query (all entries if empty), newest first.
+
+        Pass the id of the last entry of one page as `before` to get the next.
+        """
+        matching, params = self._matching(query, before)
+        if matching is None:
+            sql = "SELECT id, created, mode, source, translation FROM history ORDER BY id DESC LIMIT ?"
+        else:
+            sql = (
+                "SELECT h.id, h.created, h.mode, h.source, h.translation FROM history h "
+                f"JOIN ({matching} LIMIT ?) m ON h.id = m.id ORDER BY h.id DESC"
+            )
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [
+            {"id": row[0], "created": row[1], "mode": row[2], "source": row[3], "translation": row[4]}
+            for row in rows
+        ]
+
+    def count(self, query: str = "") -> int:
+        matching, params = self._matching(query)
+        sql = f"SELECT COUNT(*) FROM ({matching})" if matching else "SELECT COUNT(*) FROM history"
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def close(self):
+        """Write out queued entries and stop the writer"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5.0)
@@ -2,59 +2,119 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
+
+_LOADED_AT = time.perf_counter()
+_PRELOADED = set(sys.modules)
+
+if __name__ == "__main__":
+    # A running daemon answers plain one-shot calls before anything else is loaded
+    from client import forward
+    if forward(sys.argv[1:]):
+        sys.exit(0)
+
+import argparse
 from typing import Optional
-from deep_translator import GoogleTranslator  # pyright: ignore[reportMissingImports]
-from rich.console import Console  # pyright: ignore[reportMissingImports]
-from rich.panel import Panel  # pyright: ignore[reportMissingImports]
-from rich.text import Text  # pyright: ignore[reportMissingImports]
-from rich.prompt import Prompt  # pyright: ignore[reportMissingImports]
+
+from backends import available_backends
+from metrics import METRICS
+from scheduler import Priority
+from startup import NO_PROFILE, ImportProfile
+from translation import TranslationService
+
+# Rich, the translation provider and the batch machinery are imported on
+# first use so a one-shot call only loads what it actually needs.
 
 
 class PromptCompiler:
     
-    def __init__(self):
-        self.console = Console()
-        self.translator = GoogleTranslator(source='ru', target='en')
+    def __init__(self, backend: Optional[str] = None, hedge: bool = False):
+        self._console = None
+        self._history = None
+        if hedge:
+            # Race a secondary provider whenever the chosen one is slower than its usual p95
+            from backends import HedgedBackend, resolve_backend
+            from config import load_config
+            config = load_config()
+            backend = HedgedBackend(config, primary=resolve_backend(backend, config).name)
+        self.service = TranslationService(backend=backend)
+        self.service.resilience.add_retry_listener(self._on_retry)
+        self.service.resilience.breaker.add_listener(self._on_provider_state)
     
-    def translate(self, russian_text: str) -> str:
+    @property
+    def console(self):
+        if self._console is None:
+            from rich.console import Console  # pyright: ignore[reportMissingImports]
+            self._console = Console()
+        return self._console
+    
+    @property
+    def history(self):
+        """Shared history store, or None when history_enabled is off"""
+        if self._history is None and self.service.config.get("history_enabled", True):
+            from history import HistoryStore
+            self._history = HistoryStore.from_config(self.service.config)
+        return self._history
+    
+    def translate(self, russian_text: str, console=None) -> str:
         try:
-            english_text = self.translator.translate(russian_text)
-            return english_text
+            english_text = self.service.translate(russian_text)
         except Exception as e:
-            self.console.print(f"[red]Translation error: {e}[/red]")
+            (console or self.console).print(f"[red]Translation error: {e}[/red]")
             return russian_text
+        if self.history is not None:
+            self.history.record(russian_text, english_text, "cli")
+        return english_text
+    
+    def _on_retry(self, attempt: int, attempts: int, delay: float, error: Exception):
+        self.console.print(f"[dim]Retrying in {delay:.1f}s (attempt {attempt + 1}/{attempts}): {error}[/dim]")
+    
+    def _on_provider_state(self, state: str):
+        color = "green" if state == "closed" else "yellow"
+        self.console.print(f"[{color}]Translation {self.service.provider_status()}[/{color}]")
     
     def format_prompt(self, original: str, translated: str) -> str:
-        formatted = f"""Original (Russian): {original}
+        with METRICS.stage("format_prompt"):
+            formatted = f"""Original (Russian): {original}
 
 Translated (English): {translated}
 
 ---
 Formatted Prompt for Cursor:
 {translated}"""
-        return formatted
-    
-    def display_result(self, original: str, translated: str):
-        result_text = Text()
-        result_text.append("Original Query (Russian):\n", style="bold cyan")
-        result_text.append(f"{original}\n\n", style="white")
-        result_text.append("Translated Query (English):\n", style="bold green")
-        result_text.append(f"{translated}\n\n", style="white")
-        result_text.append("─" * 60 + "\n", style="dim")
-        result_text.append("Ready to use in Cursor:\n", style="bold yellow")
-        result_text.append(f"{translated}", style="bright_white")
+            return formatted
+    
+    def display_result(self, original: str, translated: str, console=None):
+        from rich.panel import Panel  # pyright: ignore[reportMissingImports]
+        from rich.text import Text  # pyright: ignore[reportMissingImports]
         
-        panel = Panel(
-            result_text,
-            title="[bold magenta]Prompt Compiler for Cursor[/bold magenta]",
-            border_style="bright_blue",
-            padding=(1, 2)
-        )
-        self.console.print("\n")
-        self.console.print(panel)
-        self.console.print("\n")
+        with METRICS.stage("render"):
+            result_text = Text()
+            result_text.append("Original Query (Russian):\n", style="bold cyan")
+            result_text.append(f"{original}\n\n", style="white")
+            result_text.append("Translated Query (English):\n", style="bold green")
+            result_text.append(f"{translated}\n\n", style="white")
+            result_text.append("─" * 60 + "\n", style="dim")
+            result_text.append("Ready to use in Cursor:\n", style="bold yellow")
+            result_text.append(f"{translated}", style="bright_white")
+            
+            panel = Panel(
+                result_text,
+                title="[bold magenta]Prompt Compiler for Cursor[/bold magenta]",
+                border_style="bright_blue",
+                padding=(1, 2)
+            )
+            console = console or self.console
+            console.print("\n")
+            console.print(panel)
+            console.print("\n")
+    
+    def display_cache_stats(self, console=None):
+        (console or self.console).print(f"[dim]{self.service.cache_stats()}[/dim]")
     
     def run_interactive(self):
+        from rich.prompt import Prompt  # pyright: ignore[reportMissingImports]
+        
         self.console.print("[bold magenta]Prompt Compiler for Cursor[/bold magenta]")
         self.console.print("[dim]Enter your query in Russian. Type 'exit' or 'quit' to exit.[/dim]\n")
         
@@ -64,6 +124,7 @@ Formatted Prompt for Cursor:
                 
                 if russian_query.lower() in ['exit', 'quit', 'выход']:
                     self.console.print("[yellow]Goodbye![/yellow]")
+                    self.display_cache_stats()
                     break
                 
                 if not russian_query.strip():
@@ -75,38 +136,315 @@ Formatted Prompt for Cursor:
                 
             except KeyboardInterrupt:
                 self.console.print("\n[yellow]Interrupted. Goodbye![/yellow]")
+                self.display_cache_stats()
                 break
             except Exception as e:
                 self.console.print(f"[red]Error: {e}[/red]")
     
-    def run_single(self, russian_text: str):
-        english_text = self.translate(russian_text)
-        self.display_result(russian_text, english_text)
+    def show_similar(self, russian_text: str, limit: int = 5):
+        """Print the past translations closest to russian_text from the translation memory"""
+        from rich.table import Table  # pyright: ignore[reportMissingImports]
+        
+        matches = self.service.similar(russian_text, limit)
+        if not matches:
+            self.console.print("[yellow]No similar translations in memory.[/yellow]")
+            return matches
+        
+        table = Table(title="Similar translations", border_style="bright_blue")
+        table.add_column("Score", justify="right", style="cyan")
+        table.add_column("Russian", style="white")
+        table.add_column("English", style="green")
+        for match in matches:
+            table.add_row(f"{match['score']:.0%}", match["source"], match["translation"])
+        self.console.print(table)
+        return matches
+    
+    def show_history(self, query: str = "", limit: int = 20):
+        """Print the newest past translations matching query (all of them if empty)"""
+        from rich.table import Table  # pyright: ignore[reportMissingImports]
+        
+        if self.history is None:
+            self.console.print("[yellow]History is disabled (history_enabled is false).[/yellow]")
+            return []
+        entries = self.history.search(query, limit=limit)
+        if not entries:
+            self.console.print("[yellow]No matching translations in history.[/yellow]")
+            return entries
+        
+        total = self.history.count(query)
+        title = f"History: {query}" if query else "History"
+        table = Table(title=title, caption=f"{len(entries)} of {total}", border_style="bright_blue")
+        table.add_column("When", style="cyan", no_wrap=True)
+        table.add_column("Russian", style="white")
+        table.add_column("English", style="green")
+        for entry in entries:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created"]))
+            table.add_row(when, entry["source"], entry["translation"])
+        self.console.print(table)
+        return entries
+    
+    def run_single(self, russian_text: str, profile=NO_PROFILE, console=None):
+        with profile.stage("translate"):
+            english_text = self.translate(russian_text, console)
+        with profile.stage("render"):
+            self.display_result(russian_text, english_text, console)
+            self.display_cache_stats(console)
         return english_text
+    
+    def run_watch(self):
+        """Pre-translate Russian text copied anywhere into the shared cache until Ctrl+C"""
+        try:
+            import tkinter as tk
+        except ImportError as e:
+            self.console.print(f"[red]--watch requires tkinter. Error: {e}[/red]")
+            return None
+        try:
+            # Never shown; it only gives access to the clipboard
+            root = tk.Tk()
+        except tk.TclError as e:
+            self.console.print(f"[red]--watch needs a display for clipboard access: {e}[/red]")
+            return None
+        root.withdraw()
+        
+        def read():
+            try:
+                return root.clipboard_get()
+            except tk.TclError:
+                return None
+        
+        from clipboard import ClipboardWatcher
+        watcher = ClipboardWatcher.from_config(self.service, read, self._on_speculated)
+        interval = float(self.service.config.get("watch_poll_interval", 0.5))
+        self.console.print("[bold magenta]Watching the clipboard[/bold magenta] [dim](Ctrl+C to stop)[/dim]")
+        try:
+            while True:
+                watcher.poll()
+                root.update()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.stop()
+            root.destroy()
+        self.console.print(
+            f"[dim]Pre-translated {watcher.speculated} clipboard text(s), skipped {watcher.skipped}. "
+            f"{self.service.cache_stats()}[/dim]"
+        )
+        return watcher
+    
+    def _on_speculated(self, russian_text: str, english_text: str, error: Exception):
+        if error is not None:
+            self.console.print(f"[yellow]Clipboard pre-translation failed: {error}[/yellow]")
+        else:
+            self.console.print(f"[green]📋[/green] {english_text}", highlight=False)
+    
+    def _translate_batch(self, russian_text: str) -> str:
+        # Bulk work yields to interactive requests sharing the provider
+        return self.service.translate(russian_text, priority=Priority.BATCH)
+    
+    def run_stream(self, workers: int = 8):
+        import io
+        from batch import run_stream
+        from rich.console import Console  # pyright: ignore[reportMissingImports]
+        
+        # stdout carries only translations; retry notices and the like go to stderr
+        self._console = Console(stderr=True)
+        # Pipes default to the locale encoding on Windows; prompts are always UTF-8
+        stdin = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace")
+        stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", line_buffering=True)
+        lines = (line.rstrip("\r\n") for line in stdin)
+        try:
+            stats = run_stream(
+                self._translate_batch, lines, stdout, workers=workers, needs_translation=self.service.needs_translation
+            )
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); stop quietly. Point stdout at
+            # devnull so the final flush at exit cannot raise again.
+            import os
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return None
+        print(
+            f"Stream complete: {stats.summary()}. {self.service.cache_stats()}. {self.service.scheduler.describe()}",
+            file=sys.stderr,
+        )
+        return stats
+    
+    def run_batch(self, input_path: str, output_path: str, workers: int = 8):
+        from batch import run_batch
+        
+        self.console.print(f"[dim]Translating {input_path} → {output_path} with {workers} workers...[/dim]")
+        stats = run_batch(
+            self._translate_batch, input_path, output_path, workers=workers,
+            needs_translation=self.service.needs_translation,
+        )
+        self.console.print(f"[green]Batch complete:[/green] {stats.summary()}")
+        self.display_cache_stats()
+        self.console.print(f"[dim]{self.service.scheduler.describe()}[/dim]")
+        return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Translate Russian queries to English prompts for Cursor")
+    parser.add_argument("text", nargs="*", help="Russian text to translate (interactive mode if omitted)")
+    parser.add_argument("--gui", "-g", action="store_true", help="launch the graphical interface")
+    parser.add_argument("--batch", metavar="INPUT", help="translate INPUT line by line")
+    parser.add_argument("--out", metavar="OUTPUT", help="JSONL file for --batch results")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="concurrent translations for --batch, --stream and --serve (default: 8)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="translate stdin line by line to stdout, in order (for pipelines)",
+    )
+    parser.add_argument(
+        "--similar",
+        metavar="TEXT",
+        help="show past translations similar to TEXT from the translation memory",
+    )
+    parser.add_argument(
+        "--history",
+        nargs="?",
+        const="",
+        metavar="QUERY",
+        help="search past translations (Russian or English); newest first, all if QUERY is omitted",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="pre-translate Russian text as it is copied to the clipboard, warming the cache",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="stay resident and answer plain `main.py TEXT` calls over a Unix socket",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="translate in this process even if a daemon is running",
+    )
+    parser.add_argument("--serve", action="store_true", help="run the JSON HTTP translation server")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port for --serve (default: 8080)")
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        help="translation engine (default: 'backend' from config.json, else google)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="also ask a secondary provider when the primary is slower than usual; first answer wins",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-stage timings (translate, cache, provider, render) when done",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="PATH",
+        help="write stage metrics to PATH (.prom/.txt: Prometheus text, otherwise JSON)",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="print a startup timing and import report to stderr",
+    )
+    args = parser.parse_args(argv)
+    if args.batch and not args.out:
+        parser.error("--batch requires --out")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.hedge:
+        from backends import resolve_backend
+        from config import load_config
+        config = load_config()
+        try:
+            primary = resolve_backend(args.backend, config).name
+        except ValueError as e:
+            parser.error(str(e))
+        if primary == "hedged":
+            parser.error("--hedge cannot race the hedged backend; pick the primary with --backend")
+        if primary == config.get("hedge_secondary", "mymemory"):
+            parser.error(f"--hedge needs a primary other than the secondary '{primary}' (hedge_secondary in config.json)")
+    if args.daemon:
+        import socket
+        if not hasattr(socket, "AF_UNIX"):
+            parser.error("--daemon needs Unix domain sockets, which this platform lacks")
+    return args
 
 
 def main():
+    profile = ImportProfile(_LOADED_AT, _PRELOADED) if "--import-profile" in sys.argv else NO_PROFILE
+    profile.record("module load", _LOADED_AT)
+    with profile.stage("parse arguments"):
+        args = parse_args()
+    
     # Check for GUI mode
-    if len(sys.argv) > 1 and sys.argv[1] in ['--gui', '-g', 'gui']:
+    if args.gui or args.text == ['gui']:
         try:
             from gui import main as gui_main
             gui_main()
         except ImportError as e:
             print(f"GUI mode requires tkinter. Error: {e}")
             print("Falling back to CLI mode...")
-            compiler = PromptCompiler()
+            compiler = PromptCompiler(backend=args.backend, hedge=args.hedge)
             compiler.run_interactive()
         return
     
-    compiler = PromptCompiler()
+    with profile.stage("create compiler"):
+        compiler = PromptCompiler(backend=args.backend, hedge=args.hedge)
     
-    if len(sys.argv) > 1:
+    if args.daemon:
+        # Resident mode: keep everything warm for the thin client
+        from daemon import serve_daemon
+        try:
+            serve_daemon(compiler)
+        except OSError as e:
+            compiler.console.print(f"[red]Cannot start daemon: {e}[/red]")
+            sys.exit(1)
+    elif args.serve:
+        # Server mode: one shared cache and connection pool for every client
+        from server import serve
+        serve(
+            compiler.service,
+            args.host,
+            args.port,
+            workers=args.workers,
+            queue_size=int(compiler.service.config.get("server_queue", 64)),
+            console=compiler.console,
+        )
+    elif args.similar:
+        # Translation memory query
+        compiler.show_similar(args.similar)
+    elif args.history is not None:
+        # Translation history search
+        compiler.show_history(args.history)
+    elif args.watch:
+        # Clipboard watcher: speculative translations into the shared cache
+        compiler.run_watch()
+    elif args.stream:
+        # Pipe mode: stdin → stdout, results in input order
+        compiler.run_stream(workers=args.workers)
+    elif args.batch:
+        # Batch mode: translate a whole file, one prompt per line
+        compiler.run_batch(args.batch, args.out, workers=args.workers)
+    elif args.text:
         # Command line mode: translate the provided text
-        russian_text = " ".join(sys.argv[1:])
-        compiler.run_single(russian_text)
+        russian_text = " ".join(args.text)
+        compiler.run_single(russian_text, profile)
     else:
         # Interactive mode
         compiler.run_interactive()
+    
+    if args.profile:
+        compiler.console.print(METRICS.format_table(), style="dim", highlight=False)
+    if args.metrics_out:
+        METRICS.write(args.metrics_out)
+    if args.import_profile:
+        print(profile.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
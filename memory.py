@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import difflib
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import List, Optional
+
+from cache import normalize_key
+from config import get_app_dir, load_config
+
+
+# One 64-byte BLAKE2b digest per n-gram yields all 16 MinHash values at once
+SIGNATURE_SIZE = 16
+_SIGNATURE = struct.Struct(f"<{SIGNATURE_SIZE}I")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]+")
+_CYRILLIC_RE = re.compile(r"[Ѐ-ӿ]")
+_NUMBER_RE = re.compile(r"\d+")
+
+# Newest entries read per bucket; near-duplicates pile into the same buckets
+CANDIDATES_PER_BUCKET = 16
+# Candidates scored exactly, those sharing the most buckets first
+SCORED_CANDIDATES = 8
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Character n-grams of the normalized text"""
+    text = f" {normalize_key(text)} "
+    return {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+
+
+def fuzzy_shingles(text: str) -> set:
+    """Shingles for indexing and scoring: numbers are carried over by substitute, so all look alike"""
+    return shingles(_NUMBER_RE.sub("0", text))
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class TranslationMemory:
+    """Fuzzy lookup of past translations by MinHash locality-sensitive hashing.
+
+    Every stored source gets a MinHash signature over its character 3-grams,
+    split into `bands` buckets. A query reads only the newest
+    CANDIDATES_PER_BUCKET entries of each of its buckets, so a bucket full of
+    near-duplicates costs no more than a sparse one; the best of those
+    candidates are then scored by exact n-gram Jaccard similarity.
+
+    `lookup` reuses a stored translation above `threshold` when the two
+    sources differ only in tokens that need no translation (numbers, Latin
+    words, placeholders); those tokens are substituted in the stored English.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = 0.8,
+        max_entries: int = 100000,
+        bands: int = 4,
+    ):
+        if SIGNATURE_SIZE % bands:
+            raise ValueError(f"bands must divide {SIGNATURE_SIZE}")
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = SIGNATURE_SIZE // bands
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            "id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, "
+            "source TEXT NOT NULL, target TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS memory_bands (bucket INTEGER NOT NULL, id INTEGER NOT NULL)")
+        self._conn.execute("DROP INDEX IF EXISTS memory_bands_bucket")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS memory_bands_bucket_id ON memory_bands (bucket, id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS memory_bands_id ON memory_bands (id)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "TranslationMemory":
+        config = config or load_config()
+        path = config.get("memory_path") or os.path.join(get_app_dir(), "memory.sqlite3")
+        return cls(
+            path,
+            threshold=float(config.get("memory_threshold", 0.8)),
+            max_entries=int(config.get("memory_max_entries", 100000)),
+        )
+
+    def _buckets(self, grams: set, namespace: str) -> List[int]:
+        digests = [_SIGNATURE.unpack(hashlib.blake2b(gram.encode("utf-8")).digest()) for gram in grams]
+        signature = list(map(min, zip(*digests)))
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(f"{namespace}|{band}|{rows}".encode("utf-8"), digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "big", signed=True))
+        return buckets
+
+    def add(self, source: str, target: str, namespace: str = ""):
+        key = f"{namespace}:{normalize_key(source)}"
+        buckets = self._buckets(fuzzy_shingles(source), namespace)
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM memory WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM memory_bands WHERE id = ?", (row[0],))
+                self._conn.execute("DELETE FROM memory WHERE id = ?", (row[0],))
+                self._count -= 1
+            cursor = self._conn.execute(
+                "INSERT INTO memory (key, source, target, created) VALUES (?, ?, ?, ?)",
+                (key, source, target, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO memory_bands (bucket, id) VALUES (?, ?)",
+                [(bucket, cursor.lastrowid) for bucket in buckets],
+            )
+            self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Oldest tenth goes at once so eviction does not run on every insert
+        excess = self._count - self.max_entries + max(1, self.max_entries // 10)
+        ids = [row[0] for row in self._conn.execute("SELECT id FROM memory ORDER BY id LIMIT ?", (excess,))]
+        if ids:
+            self._conn.execute("DELETE FROM memory_bands WHERE id <= ?", (ids[-1],))
+            self._conn.execute("DELETE FROM memory WHERE id <= ?", (ids[-1],))
+            self._count -= len(ids)
+
+    def search(self, text: str, limit: int = 5, namespace: str = "", min_score: float = 0.0) -> List[dict]:
+        """Most similar stored entries as {"score", "source", "translation"} dicts, best first"""
+        grams = fuzzy_shingles(text)
+        buckets = self._buckets(grams, namespace)
+        # Each bucket contributes at most its newest CANDIDATES_PER_BUCKET ids
+        per_bucket = " UNION ALL ".join(
+            "SELECT id FROM (SELECT id FROM memory_bands WHERE bucket = ? ORDER BY id DESC LIMIT ?)"
+            for _ in buckets
+        )
+        params = [value for bucket in buckets for value in (bucket, CANDIDATES_PER_BUCKET)]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.source, m.target FROM memory m JOIN ("
+                f"SELECT id, COUNT(*) AS shared FROM ({per_bucket}) "
+                "GROUP BY id ORDER BY shared DESC, id DESC LIMIT ?"
+                ") c ON c.id = m.id",
+                params + [max(limit, SCORED_CANDIDATES)],
+            ).fetchall()
+        matches = []
+        for source, target in rows:
+            score = jaccard(grams, fuzzy_shingles(source))
+            if score >= min_score:
+                matches.append({"score": score, "source": source, "translation": target})
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return matches[:limit]
+
+    def lookup(self, text: str, namespace: str = "") -> Optional[str]:
+        """Translation adapted from a similar stored entry, or None"""
+        for match in self.search(text, limit=3, namespace=namespace, min_score=self.threshold):
+            translation = substitute(match["source"], text, match["translation"])
+            if translation is not None:
+                self.hits += 1
+                return translation
+        self.misses += 1
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM memory_bands")
+            self._conn.execute("DELETE FROM memory")
+            self._conn.commit()
+            self._count = 0
+
+    def format_stats(self) -> str:
+        return f"Memory: {self.hits} fuzzy hits, {self.misses} misses ({self._count} entries)"
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def substitute(old_source: str, new_source: str, old_target: str) -> Optional[str]:
+    """Carry the token changes between two sources over to a translation.
+
+    Only changed spans without Cyrillic (numbers, names, placeholders) can be
+    carried over, and only if the old span appears exactly once in the
+    translation. Anything else needs a real translation: returns None.
+    """
+    old_tokens = list(_TOKEN_RE.finditer(old_source))
+    new_tokens = list(_TOKEN_RE.finditer(new_source))
+    matcher = difflib.SequenceMatcher(
+        None,
+        [normalize_key(t.group(0)) for t in old_tokens],
+        [normalize_key(t.group(0)) for t in new_tokens],
+        autojunk=False,
+    )
+    replacements = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if i1 == i2 or j1 == j2:
+            return None  # Inserted or deleted words have no place in the translation
+        old_span = old_source[old_tokens[i1].start():old_tokens[i2 - 1].end()]
+        new_span = new_source[new_tokens[j1].start():new_tokens[j2 - 1].end()]
+        if _CYRILLIC_RE.search(old_span) or _CYRILLIC_RE.search(new_span):
+            return None
+        if old_target.count(old_span) != 1:
+            return None
+        replacements.append((old_target.index(old_span), old_span, new_span))
+
+    parts = []
+    position = 0
+    for start, old_span, new_span in sorted(replacements):
+        if start < position:
+            return None
+        parts.append(old_target[position:start] + new_span)
+        position = start + len(old_span)
+    return "".join(parts) + old_target[position:]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+
+# Upper bounds in seconds, from cache hits to slow provider round trips
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative bucket counts plus a rolling window of recent samples"""
+
+    def __init__(self, window: int = 512):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_s": self.sum,
+            "last_s": self.recent[-1] if self.recent else 0.0,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+            "max_s": max(self.recent) if self.recent else 0.0,
+        }
+
+
+class Metrics:
+    """Per-stage timings and event counters for the translation hot path.
+
+    Stages are timed with the monotonic perf counter. Export with
+    `to_prometheus()` (text exposition format) or `to_json()`.
+    """
+
+    PREFIX = "prompt_compiler"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def recent(self, name: str) -> list:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            return list(histogram.recent) if histogram else []
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "stages": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        name = f"{self.PREFIX}_stage_seconds"
+        lines = [
+            f"# HELP {name} Duration of translation pipeline stages.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), histogram.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+            events = f"{self.PREFIX}_events_total"
+            lines.append(f"# HELP {events} Translation pipeline events.")
+            lines.append(f"# TYPE {events} counter")
+            for event, value in sorted(self._counters.items()):
+                lines.append(f'{events}{{event="{event}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write Prometheus text for .prom/.txt paths, JSON otherwise"""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def format_table(self) -> str:
+        lines = [f"{'stage':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for stage, summary in self.snapshot()["stages"].items():
+            lines.append(
+                f"{stage:<16}{summary['count']:>7}{summary['p50_s'] * 1000:>10.2f}"
+                f"{summary['p95_s'] * 1000:>10.2f}{summary['max_s'] * 1000:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+# Process-wide registry shared by the CLI, the GUI and the service
+METRICS = Metrics()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Fenced blocks are kept whole by the segmenter; the rest is masked per segment
+FENCED_CODE_RE = re.compile(r"```.*?(?:```|\Z)", re.S)
+
+_PROTECTED_RE = re.compile(
+    r"""
+      `[^`\n]+`                                      # inline code
+    | (?:https?|ftp)://[^\s<>"'`]+[^\s<>"'`.,;:!?)]  # URLs
+    | (?:[A-Za-z]:\\|~/|\.{1,2}/|/)?                 # paths: optional root...
+      (?:[\w.-]+[/\\])+[\w.-]+                       # ...then dir/dir/file
+    | \b[\w-]+\.[A-Za-z][A-Za-z0-9]{0,4}\b           # file names: main.py, README.md
+    | \b[A-Za-z_]\w*\(\)                             # calls: run_single()
+    | \b[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+\b            # dotted names: self.service
+    | \b[A-Za-z]+_\w+\b                              # snake_case
+    | \b[a-z]+[A-Z]\w*\b                             # camelCase
+    """,
+    re.X | re.A,  # ASCII \w and \b: Cyrillic words are never identifiers
+)
+
+_PLACEHOLDER_RE = re.compile(r"⟦\s*(\d+)\s*⟧")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+def mask(text: str) -> Tuple[str, List[str]]:
+    """Replace code, identifiers, paths and URLs with ⟦n⟧ placeholders"""
+    spans = []
+
+    def replace(match):
+        spans.append(match.group(0))
+        return f"⟦{len(spans) - 1}⟧"
+
+    return _PROTECTED_RE.sub(replace, text), spans
+
+
+def unmask(text: str, spans: List[str]) -> Optional[str]:
+    """Put the spans back; None if the provider lost or invented a placeholder"""
+    seen = set()
+
+    def replace(match):
+        index = int(match.group(1))
+        seen.add(index)
+        return spans[index] if index < len(spans) else match.group(0)
+
+    restored = _PLACEHOLDER_RE.sub(replace, text)
+    if seen != set(range(len(spans))):
+        return None
+    return restored
+
+
+def has_prose(masked: str) -> bool:
+    """Whether anything besides placeholders, digits and punctuation is left to translate"""
+    return bool(_LETTER_RE.search(_PLACEHOLDER_RE.sub("", masked)))
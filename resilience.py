@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_in: float):
+        super().__init__(f"Translation provider unavailable, next attempt in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fails fast while the provider is down.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls are rejected immediately. Once `reset_timeout` has
+    passed a single trial call is let through (half-open); its outcome
+    closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            for listener in self._listeners:
+                listener(state)
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and self.retry_in() > 0:
+                raise CircuitOpenError(self.retry_in())
+            if self._trial_running:
+                raise CircuitOpenError(self.retry_in())
+            self._trial_running = True
+            self._set_state(self.HALF_OPEN)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def record_neutral(self):
+        """A call that failed for reasons unrelated to provider health"""
+        with self._lock:
+            if self._trial_running:
+                self._trial_running = False
+                self._set_state(self.CLOSED if self.failures < self.failure_threshold else self.OPEN)
+
+    def describe(self) -> str:
+        if self.state == self.OPEN:
+            return f"provider down, circuit open (retry in {self.retry_in():.0f}s)"
+        if self.state == self.HALF_OPEN:
+            return "provider recovering, circuit half-open"
+        return "provider ok"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by a per-call deadline"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0, deadline: float = 30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class Resilience:
+    """Retry and circuit breaking around calls to one translation provider.
+
+    `is_transient(exc)` decides which errors are worth retrying and count
+    against the provider's health. `fn` is called with a `deadline` keyword
+    (a time.monotonic() value) and must not run past it, so the whole call,
+    retries included, ends within the policy deadline. Retry notices go to `on_retry`
+    listeners as (attempt, attempts, delay, error).
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        is_transient: Callable[[Exception], bool] = lambda exc: isinstance(exc, OSError),
+    ):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.is_transient = is_transient
+        self.retries = 0
+        self._retry_listeners = []
+
+    @classmethod
+    def from_config(cls, config: dict, is_transient: Callable[[Exception], bool]) -> "Resilience":
+        return cls(
+            RetryPolicy(
+                attempts=int(config.get("retry_attempts", 3)),
+                base_delay=float(config.get("retry_base_delay", 0.5)),
+                max_delay=float(config.get("retry_max_delay", 8.0)),
+                deadline=float(config.get("request_deadline", 30.0)),
+            ),
+            CircuitBreaker(
+                failure_threshold=int(config.get("breaker_failure_threshold", 5)),
+                reset_timeout=float(config.get("breaker_reset_timeout", 30.0)),
+            ),
+            is_transient,
+        )
+
+    def add_retry_listener(self, listener: Callable):
+        self._retry_listeners.append(listener)
+
+    def call(self, fn: Callable, *args):
+        deadline = time.monotonic() + self.policy.deadline
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = fn(*args, deadline=deadline)
+            except Exception as e:
+                if not self.is_transient(e):
+                    self.breaker.record_neutral()
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= self.policy.attempts or self.breaker.state == CircuitBreaker.OPEN:
+                    raise
+                delay = self.policy.delay(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise DeadlineExceeded(
+                        f"Gave up after {attempt} attempt(s) within {self.policy.deadline:.0f}s: {e}"
+                    ) from e
+                self.retries += 1
+                for listener in self._retry_listeners:
+                    listener(attempt, self.policy.attempts, delay, e)
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
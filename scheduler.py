@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from metrics import METRICS
+
+
+class Priority:
+    """Scheduler lanes; a lower number is always served first"""
+
+    INTERACTIVE = 0  # GUI and CLI requests someone is waiting for
+    BATCH = 1  # --batch, --stream and server batch work
+    BACKGROUND = 2  # speculative work nobody asked for yet
+
+    LANES = 3
+
+
+class Scheduler:
+    """Admission control for calls to one rate-limited provider.
+
+    Every provider call passes `acquire` / `release` (or `call`). A call is
+    admitted when it is at the head of the highest non-empty priority lane,
+    fewer than `limit` calls are in flight and the token bucket has a token.
+
+    Both the concurrency limit and the token rate adapt (AIMD): each success
+    adds a little, a throttled call (HTTP 429) halves them, and a latency
+    well above the best seen recently trims the concurrency limit, so the
+    request rate settles just under what the provider tolerates instead of
+    running into its blocking threshold. Decreases happen at most once per
+    round trip, so one burst of 429s counts as a single signal.
+    """
+
+    MIN_RATE = 0.5
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: int = 5,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        initial_concurrency: int = 4,
+        latency_tolerance: float = 3.0,
+    ):
+        self.max_rate = rate
+        self.rate = rate or None  # None: no limit until the provider throttles us
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.throttled = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._baseline = None
+        self._last_decrease = 0.0
+        self._completions = deque()
+        self._lanes = [deque() for _ in range(Priority.LANES)]
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Scheduler":
+        return cls(
+            rate=float(config.get("scheduler_rate", 0.0)),
+            burst=int(config.get("scheduler_burst", 5)),
+            min_concurrency=int(config.get("scheduler_min_concurrency", 1)),
+            max_concurrency=int(config.get("scheduler_max_concurrency", 16)),
+            initial_concurrency=int(config.get("scheduler_initial_concurrency", 4)),
+            latency_tolerance=float(config.get("scheduler_latency_tolerance", 3.0)),
+        )
+
+    def _head(self):
+        for lane in self._lanes:
+            if lane:
+                return lane[0]
+        return None
+
+    def _token_wait(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is), refilling the bucket first"""
+        if self.rate is None:
+            return 0.0
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def acquire(self, priority: int = Priority.INTERACTIVE):
+        ticket = object()
+        lane = self._lanes[priority]
+        started = time.perf_counter()
+        with self._cond:
+            lane.append(ticket)
+            try:
+                while True:
+                    if self._head() is ticket and self.inflight < int(self.limit):
+                        wait = self._token_wait(time.monotonic())
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                lane.remove(ticket)
+                self._cond.notify_all()
+            if self.rate is not None:
+                self._tokens -= 1
+            self.inflight += 1
+        METRICS.observe("queue_wait", time.perf_counter() - started)
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        """End of a call: its latency if it succeeded, throttled if the provider said 429"""
+        now = time.monotonic()
+        with self._cond:
+            self.inflight -= 1
+            round_trip = self._baseline or 1.0
+            if throttled:
+                self.throttled += 1
+                METRICS.inc("throttled")
+                if now - self._last_decrease > round_trip:
+                    self._last_decrease = now
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    observed = self._observed_rate(now)
+                    current = self.rate if self.rate is not None else observed
+                    self.rate = max(self.MIN_RATE, min(current, observed or current) / 2)
+                    # Restart the bucket now: with no rate so far, _refilled dates from creation
+                    self._tokens = 0.0
+                    self._refilled = now
+            elif latency is not None:
+                self._completions.append(now)
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency
+                else:
+                    # Let the baseline drift up slowly so a permanently slower provider is accepted
+                    self._baseline += (latency - self._baseline) * 0.01
+                if latency > self._baseline * self.latency_tolerance and now - self._last_decrease > latency:
+                    self._last_decrease = now
+                    self.limit = max(float(self.min_concurrency), self.limit * 0.9)
+                else:
+                    self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                if self.rate is not None:
+                    self.rate += 1 / self.rate
+                    if self.max_rate:
+                        self.rate = min(self.rate, self.max_rate)
+            self._cond.notify_all()
+
+    def _observed_rate(self, now: float, window: float = 2.0) -> float:
+        while self._completions and now - self._completions[0] > window:
+            self._completions.popleft()
+        return len(self._completions) / window
+
+    def call(
+        self,
+        fn: Callable,
+        *args,
+        priority: int = Priority.INTERACTIVE,
+        is_throttled: Callable[[Exception], bool] = lambda exc: False,
+    ):
+        self.acquire(priority)
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.release(throttled=is_throttled(e))
+            raise
+        self.release(time.perf_counter() - started)
+        return result
+
+    def describe(self) -> str:
+        with self._cond:
+            waiting = sum(len(lane) for lane in self._lanes)
+            rate = f"{self.rate:.1f}/s" if self.rate is not None else "unlimited"
+            return (
+                f"Scheduler: concurrency {int(self.limit)}, {self.inflight} in flight, "
+                f"{waiting} queued, rate {rate}, {self.throttled} throttled"
+            )
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str, config: dict) -> Scheduler:
+    """Process-wide scheduler for provider `name`, shared by every service using it"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            scheduler = _schedulers[name] = Scheduler.from_config(config)
+        return scheduler
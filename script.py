@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+
+
+_CYRILLIC_RE = re.compile(r"[Ѐ-ӿ]")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+def cyrillic_ratio(text: str) -> float:
+    """Share of letters in text that are Cyrillic (0.0 when there are no letters)"""
+    if text.isascii():
+        return 0.0
+    letters = len(_LETTER_RE.findall(text))
+    return len(_CYRILLIC_RE.findall(text)) / letters if letters else 0.0
+
+
+def needs_translation(text: str, min_ratio: float = 0.0) -> bool:
+    """Whether text has enough Cyrillic to be worth sending to a provider.
+
+    With the default `min_ratio` any Cyrillic letter counts, so a single
+    Russian word in an English sentence is still translated; pure
+    ASCII/Latin input is rejected without scanning.
+    """
+    if text.isascii() or not _CYRILLIC_RE.search(text):
+        return False
+    return min_ratio <= 0.0 or cyrillic_ratio(text) > min_ratio
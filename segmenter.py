@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from typing import List, Tuple
+
+from protect import FENCED_CODE_RE
+
+
+# GoogleTranslator rejects anything longer than 5000 characters
+MAX_SEGMENT_CHARS = 4500
+
+_PARAGRAPH_BREAK_RE = re.compile(r"(\s*\n[ \t\r\f\v]*\n\s*)")
+_LINE_BREAK_RE = re.compile(r"(\s*\n\s*)")
+_EDGE_SPACE_RE = re.compile(r"^(\s*)(.*?)(\s*)$", re.S)
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?…;:])(\s+)")
+_WORD_BREAK_RE = re.compile(r"(\s+)")
+
+
+def split_segments(text: str, limit: int = MAX_SEGMENT_CHARS) -> List[Tuple[str, bool]]:
+    """Split text into (piece, translatable) pairs that join back to the original.
+
+    Every paragraph (text between blank lines) is one segment, hard-wrapped
+    lines included, so the provider sees whole sentences and editing one
+    paragraph of a long prompt only changes that paragraph's segment.
+    Paragraph breaks and surrounding whitespace are kept verbatim as
+    non-translatable pieces. Paragraphs longer than `limit` are packed
+    sentence by sentence, then word by word. Fenced ``` code blocks are
+    kept whole and never translated.
+    """
+    pieces = []
+    position = 0
+    for match in FENCED_CODE_RE.finditer(text):
+        pieces.extend(_split_paragraphs(text[position:match.start()], limit))
+        pieces.append((match.group(0), False))
+        position = match.end()
+    pieces.extend(_split_paragraphs(text[position:], limit))
+    return pieces
+
+
+def _split_paragraphs(text: str, limit: int) -> List[Tuple[str, bool]]:
+    return _split_on(_PARAGRAPH_BREAK_RE, text, lambda body: _split_long(body, limit))
+
+
+def _split_on(pattern, text: str, split_body) -> List[Tuple[str, bool]]:
+    """Split text at pattern, keeping the breaks and edge whitespace as non-translatable pieces"""
+    pieces = []
+    if not text:
+        return pieces
+    for index, part in enumerate(pattern.split(text)):
+        if index % 2:
+            pieces.append((part, False))
+            continue
+        leading, body, trailing = _EDGE_SPACE_RE.match(part).groups()
+        if leading:
+            pieces.append((leading, False))
+        if body:
+            pieces.extend(split_body(body))
+        if trailing:
+            pieces.append((trailing, False))
+    return pieces
+
+
+def split_sentences(text: str) -> List[Tuple[str, bool]]:
+    """Like split_segments, but every line and sentence is its own translatable piece"""
+    pieces = []
+    for piece, translatable in split_segments(text):
+        if not translatable:
+            pieces.append((piece, False))
+            continue
+        for line, line_translatable in _split_on(_LINE_BREAK_RE, piece, lambda body: [(body, True)]):
+            if not line_translatable:
+                pieces.append((line, False))
+                continue
+            for index, part in enumerate(_SENTENCE_BREAK_RE.split(line)):
+                if part:
+                    pieces.append((part, not index % 2))
+    return pieces
+
+
+def _split_long(text: str, limit: int) -> List[Tuple[str, bool]]:
+    if len(text) <= limit:
+        return [(text, True)]
+
+    pieces = []
+    for unit, separator in _pack(_SENTENCE_BREAK_RE.split(text), limit):
+        if len(unit) <= limit:
+            pieces.append((unit, True))
+        else:
+            for word_unit, word_separator in _pack(_WORD_BREAK_RE.split(unit), limit):
+                # A single "word" over the limit can only be cut
+                for start in range(0, len(word_unit), limit):
+                    pieces.append((word_unit[start:start + limit], True))
+                if word_separator:
+                    pieces.append((word_separator, False))
+        if separator:
+            pieces.append((separator, False))
+    return pieces
+
+
+def _pack(parts: List[str], limit: int) -> List[Tuple[str, str]]:
+    """Greedily join alternating [text, sep, text, ...] parts into units no longer than limit"""
+    units = []
+    current = parts[0]
+    for i in range(1, len(parts), 2):
+        separator, following = parts[i], parts[i + 1]
+        if len(current) + len(separator) + len(following) <= limit:
+            current += separator + following
+        else:
+            units.append((current, separator))
+            current = following
+    units.append((current, ""))
+    return units
+
+
+def join_segments(pieces: List[Tuple[str, bool]], translations: dict) -> str:
+    return "".join(translations.get(piece, piece) if translatable else piece for piece, translatable in pieces)
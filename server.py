@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from batch import translate_ordered
+from metrics import METRICS
+from scheduler import Priority
+
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_ITEMS = 1000
+
+
+class TranslationHTTPServer(HTTPServer):
+    """JSON API around one shared TranslationService.
+
+    Requests are handled by a fixed pool of workers. Up to `queue_size`
+    more connections may wait for a worker; anything beyond that is refused
+    at once with 503 and Retry-After, so a burst of clients cannot pile up
+    unbounded threads or memory.
+    """
+
+    def __init__(self, service, host: str = "127.0.0.1", port: int = 8080, workers: int = 8, queue_size: int = 64):
+        super().__init__((host, port), TranslationRequestHandler)
+        self.service = service
+        self.workers = workers
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            METRICS.inc("server_rejected")
+            self._reject(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _reject(self, request):
+        body = b'{"error": "server busy"}'
+        try:
+            request.sendall(
+                b"HTTP/1.0 503 Service Unavailable\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Retry-After: 1\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    server_version = "PromptCompiler/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            service = self.server.service
+            self._send_json(200, {
+                "status": "ok",
+                "backend": service.backend_name,
+                "provider": service.provider_status(),
+                "cache": service.cache.stats() if service.cache is not None else None,
+                "scheduler": service.scheduler.describe(),
+            })
+        elif self.path == "/metrics":
+            self._send(200, METRICS.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        payload = self._read_json()
+        if payload is None:
+            return
+        if self.path == "/translate":
+            self._translate(payload)
+        elif self.path == "/batch":
+            self._batch(payload)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _translate(self, payload: dict):
+        text = payload.get("text")
+        if not isinstance(text, str):
+            self._send_json(400, {"error": "'text' must be a string"})
+            return
+        try:
+            with METRICS.stage("server_translate"):
+                translation = self.server.service.translate(text)
+        except Exception as e:
+            self._send_json(502, {"error": f"Translation error: {e}"})
+            return
+        self._send_json(200, {"translation": translation})
+
+    def _batch(self, payload: dict):
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            self._send_json(400, {"error": "'texts' must be a list of strings"})
+            return
+        if len(texts) > MAX_BATCH_ITEMS:
+            self._send_json(413, {"error": f"at most {MAX_BATCH_ITEMS} texts per batch"})
+            return
+
+        results = []
+        with METRICS.stage("server_batch"):
+            for _, translation, error in translate_ordered(self._translate_batch, texts, workers=4):
+                results.append({"translation": translation, "error": error} if error else {"translation": translation})
+        self._send_json(200, {"results": results})
+
+    def _translate_batch(self, text: str) -> str:
+        return self.server.service.translate(text, priority=Priority.BATCH)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request body too large"})
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return None
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "expected a JSON object"})
+            return None
+        return payload
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host: str = "127.0.0.1", port: int = 8080, workers: int = 8, queue_size: int = 64, console=None):
+    server = TranslationHTTPServer(service, host, port, workers, queue_size)
+    if console is not None:
+        console.print(
+            f"[bold magenta]Prompt Compiler server[/bold magenta] on http://{host}:{server.server_port} "
+            f"[dim]({workers} workers, queue {queue_size}; Ctrl+C to stop)[/dim]"
+        )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
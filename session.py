@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Optional
+
+from config import get_app_dir, load_config
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def credential_fingerprint(stored_hash: str) -> str:
+    """Short digest of a user's stored password hash; changes when the password does"""
+    return hashlib.sha256(stored_hash.encode("utf-8")).hexdigest()[:16]
+
+
+class SessionStore:
+    """Signed, expiring login token kept on this machine.
+
+    A successful login issues `<payload>.<signature>`, where the payload
+    carries the username, issue and expiry times and a fingerprint of the
+    user's stored password hash, and the signature is an HMAC-SHA256 under
+    a random secret that never leaves the app directory. `verify` needs no
+    network, so later launches skip the login window until the token
+    expires. `revalidate` checks the fingerprint against the user store
+    and revokes the token once the user is gone or their password changed.
+    Deleting the secret file revokes every token at once.
+    """
+
+    def __init__(self, directory: str, ttl: float = 7 * 24 * 3600):
+        self.token_path = os.path.join(directory, "session.token")
+        self.secret_path = os.path.join(directory, "session.key")
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "SessionStore":
+        config = config or load_config()
+        return cls(get_app_dir(), ttl=float(config.get("auth_session_ttl", 7 * 24 * 3600)))
+
+    def _secret(self, create: bool = False) -> Optional[bytes]:
+        try:
+            with open(self.secret_path, "rb") as f:
+                secret = f.read()
+            if len(secret) >= 32:
+                return secret
+        except OSError:
+            pass
+        if not create:
+            return None
+        secret = os.urandom(32)
+        fd = os.open(self.secret_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secret)
+        return secret
+
+    def _sign(self, secret: bytes, payload: str) -> str:
+        return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, username: str, stored_hash: str) -> Optional[dict]:
+        """Write a fresh token for username; None when sessions are disabled (ttl 0)"""
+        if self.ttl <= 0:
+            return None
+        now = time.time()
+        session = {
+            "user": username,
+            "issued": now,
+            "expires": now + self.ttl,
+            "credential": credential_fingerprint(stored_hash),
+        }
+        payload = _b64encode(json.dumps(session, sort_keys=True).encode("utf-8"))
+        token = f"{payload}.{self._sign(self._secret(create=True), payload)}"
+        fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(token)
+        return session
+
+    def verify(self) -> Optional[dict]:
+        """The stored session if its signature holds and it has not expired; offline"""
+        if self.ttl <= 0:
+            return None
+        secret = self._secret()
+        try:
+            with open(self.token_path, "r", encoding="ascii") as f:
+                payload, signature = f.read().strip().split(".")
+            if secret is None or not hmac.compare_digest(signature, self._sign(secret, payload)):
+                return None
+            session = json.loads(_b64decode(payload).decode("utf-8"))
+            issued, expires = float(session["issued"]), float(session["expires"])
+        except (OSError, ValueError, UnicodeError, KeyError, TypeError):
+            return None
+        now = time.time()
+        # A token from the future means the clock was turned back; do not trust it
+        if not issued - 300 <= now < expires:
+            return None
+        return session
+
+    def revalidate(self, session: dict, user_store) -> Optional[bool]:
+        """Check session against the user store: True if still valid, False if revoked
+        (the token is deleted), None if the store cannot be reached"""
+        try:
+            stored_hash = user_store.lookup(session["user"])
+        except Exception:
+            return None
+        if stored_hash is not None and hmac.compare_digest(
+            credential_fingerprint(stored_hash), session["credential"]
+        ):
+            return True
+        self.revoke()
+        return False
+
+    def revoke(self):
+        try:
+            os.remove(self.token_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+from contextlib import contextmanager
+
+
+class ImportProfile:
+    """Startup timeline for `main.py --import-profile`.
+
+    Each stage records its wall time and the top-level modules it pulled
+    in, which shows exactly what a one-shot CLI call pays for.
+    """
+
+    def __init__(self, started: float, preloaded=None):
+        self.started = started
+        self.stages = []
+        self._known = {name.split(".")[0] for name in (preloaded or sys.modules)}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def record(self, name: str, start: float):
+        elapsed = time.perf_counter() - start
+        loaded = {module.split(".")[0] for module in sys.modules} - self._known
+        self._known |= loaded
+        self.stages.append((name, elapsed, sorted(loaded)))
+
+    def report(self) -> str:
+        total = time.perf_counter() - self.started
+        lines = ["Startup profile (ms since main.py was loaded):"]
+        for name, elapsed, loaded in self.stages:
+            modules = f"  imports: {', '.join(loaded)}" if loaded else ""
+            lines.append(f"  {name:<22}{elapsed * 1000:8.1f}{modules}")
+        lines.append(f"  {'total':<22}{total * 1000:8.1f}")
+        return "\n".join(lines)
+
+
+class _NoProfile:
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def record(self, name: str, start: float):
+        pass
+
+
+NO_PROFILE = _NoProfile()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import Iterator, Optional, Union
+
+from backends import TranslationBackend, resolve_backend
+from cache import TranslationCache
+from config import load_config
+from memory import TranslationMemory
+from metrics import METRICS
+from protect import has_prose, mask, unmask
+from resilience import Resilience
+from scheduler import Priority, get_scheduler
+from script import needs_translation
+from segmenter import MAX_SEGMENT_CHARS, join_segments, split_segments
+
+
+class TranslationService:
+    """Russian to English translation shared by the CLI and the GUI.
+
+    Text is split into line/sentence segments under the provider limit.
+    Each segment reads through the persistent cache first, then the fuzzy
+    translation memory (near-duplicates differing only in numbers or
+    names); the remaining misses are translated in parallel and the result
+    is reassembled with the original layout. Input and segments without
+    Cyrillic are already English and are kept as they are, with no cache or
+    provider work. Code, identifiers, paths and URLs are swapped for
+    placeholders before the provider sees them (see protect.py). Errors are
+    raised to the caller. Safe to call from several threads at once.
+
+    The backend is only constructed on the first cache miss, so fully cached
+    requests never pay for provider setup. Provider calls are retried with
+    backoff and guarded by a circuit breaker (`self.resilience`), and every
+    attempt is admitted by the provider's shared `scheduler` in `priority`
+    order (interactive work ahead of batch and background work).
+    """
+
+    def __init__(
+        self,
+        cache: Optional[TranslationCache] = None,
+        config: Optional[dict] = None,
+        backend: Union[str, TranslationBackend, None] = None,
+        memory: Optional[TranslationMemory] = None,
+    ):
+        config = config or load_config()
+        self.config = config
+        if isinstance(backend, TranslationBackend):
+            self._backend = backend
+            self.backend_name = backend.name
+            self.provider_name = backend.provider_name(backend.config)
+        else:
+            self._backend = None
+            backend_class = resolve_backend(backend, config)
+            self.backend_name = backend_class.name
+            self.provider_name = backend_class.provider_name(config)
+        if cache is None and config.get("cache_enabled", True):
+            cache = TranslationCache.from_config(config)
+        self.cache = cache
+        if memory is None and config.get("memory_enabled", True):
+            memory = TranslationMemory.from_config(config)
+        self.memory = memory
+        # Never send a segment longer than the provider accepts (MyMemory takes 500 characters)
+        self.segment_limit = min(
+            int(config.get("segment_max_chars", MAX_SEGMENT_CHARS)),
+            resolve_backend(self.provider_name, config).max_chars,
+        )
+        self.segment_workers = int(config.get("segment_workers", 4))
+        self.min_cyrillic_ratio = float(config.get("min_cyrillic_ratio", 0.0))
+        self.resilience = Resilience.from_config(config, lambda exc: self.backend.is_transient(exc))
+        self.scheduler = get_scheduler(self.provider_name, config)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> TranslationBackend:
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = resolve_backend(self.backend_name, self.config)(self.config)
+        return self._backend
+
+    def _segment_pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.segment_workers, thread_name_prefix="segment"
+                )
+            return self._pool
+
+    @property
+    def _cache_namespace(self) -> str:
+        # Google entries keep the bare key so caches written before backends existed stay valid
+        return "" if self.provider_name == "google" else self.provider_name
+
+    def needs_translation(self, text: str) -> bool:
+        """False for input that is already English (no or too little Cyrillic)"""
+        return needs_translation(text, self.min_cyrillic_ratio)
+
+    def _plan(self, russian_text: str):
+        """Segments of text and the distinct ones that actually need the provider"""
+        pieces = split_segments(russian_text, self.segment_limit)
+        segments = [piece for piece, translatable in pieces if translatable]
+        # Already-English lines of mixed input are kept as they are
+        russian = [segment for segment in segments if self.needs_translation(segment)]
+        if len(russian) < len(segments):
+            METRICS.inc("script_skip", len(segments) - len(russian))
+        return pieces, list(dict.fromkeys(russian))
+
+    def translate(self, russian_text: str, priority: int = Priority.INTERACTIVE) -> str:
+        if not self.needs_translation(russian_text):
+            METRICS.inc("script_skip")
+            return russian_text
+        with METRICS.stage("translate"):
+            pieces, segments = self._plan(russian_text)
+            if not segments:
+                return russian_text
+            return join_segments(pieces, self.translate_segments(segments, priority))
+
+    def translate_pieces(self, russian_text: str, priority: int = Priority.INTERACTIVE) -> Iterator[str]:
+        """Like translate, but yields the output piece by piece, in order, as segments finish.
+
+        All segments are started at once; a piece is yielded as soon as it
+        and everything before it are translated, so a caller can show the
+        beginning of a long result while the rest is still in flight.
+        Closing the generator early cancels the segments not yet started.
+        """
+        if not self.needs_translation(russian_text):
+            METRICS.inc("script_skip")
+            yield russian_text
+            return
+        with METRICS.stage("translate"):
+            pieces, segments = self._plan(russian_text)
+            pool = self._segment_pool()
+            futures = {segment: pool.submit(self.translate_segment, segment, priority) for segment in segments}
+            try:
+                for piece, translatable in pieces:
+                    future = futures.get(piece) if translatable else None
+                    yield future.result() if future is not None else piece
+            finally:
+                # A caller that stops early (generator closed) must not pay for the remaining segments
+                for future in futures.values():
+                    future.cancel()
+
+    def translate_segments(self, segments, priority: int = Priority.INTERACTIVE) -> dict:
+        """Translate independent segments, in parallel when there is more than one"""
+        segments = list(dict.fromkeys(segments))
+        if len(segments) == 1:
+            return {segments[0]: self.translate_segment(segments[0], priority)}
+        results = self._segment_pool().map(lambda segment: self.translate_segment(segment, priority), segments)
+        return dict(zip(segments, results))
+
+    def translate_segment(self, segment: str, priority: int = Priority.INTERACTIVE) -> str:
+        """Translate one segment with code, identifiers, paths and URLs left untouched"""
+        masked, spans = mask(segment)
+        if not has_prose(masked):
+            METRICS.inc("protected_skip")
+            return segment
+        if not self.needs_translation(masked):
+            METRICS.inc("script_skip")
+            return segment
+        if not spans:
+            return self._translate_text(segment, priority)
+
+        METRICS.inc("protected_chars", sum(len(span) for span in spans))
+        restored = unmask(self._translate_text(masked, priority), spans)
+        if restored is None:
+            # The provider mangled a placeholder; fall back to the plain text
+            METRICS.inc("protected_fallback")
+            return self._translate_text(segment, priority)
+        return restored
+
+    def _translate_text(self, segment: str, priority: int) -> str:
+        if self.cache is not None:
+            with METRICS.stage("cache_lookup"):
+                cached = self.cache.get(segment, self._cache_namespace)
+            if cached is not None:
+                METRICS.inc("cache_hit")
+                return cached
+            METRICS.inc("cache_miss")
+
+        if self.memory is not None:
+            with METRICS.stage("memory_lookup"):
+                reused = self.memory.lookup(segment, self._cache_namespace)
+            if reused is not None:
+                METRICS.inc("memory_hit")
+                if self.cache is not None:
+                    self.cache.put(segment, reused, self._cache_namespace)
+                return reused
+
+        try:
+            with METRICS.stage("provider"):
+                english_text = self.resilience.call(self._scheduled_call, segment, priority)
+        except Exception:
+            METRICS.inc("provider_error")
+            raise
+        if self.cache is not None and english_text:
+            self.cache.put(segment, english_text, self._cache_namespace)
+        if self.memory is not None and english_text:
+            self.memory.add(segment, english_text, self._cache_namespace)
+        return english_text
+
+    def _scheduled_call(self, segment: str, priority: int, deadline: float) -> str:
+        return self.backend.translate_scheduled(segment, priority, deadline)
+
+    def provider_status(self) -> str:
+        return self.resilience.breaker.describe()
+
+    def similar(self, text: str, limit: int = 5) -> list:
+        """Past translations most similar to text, as {"score", "source", "translation"} dicts"""
+        if self.memory is None:
+            return []
+        masked, _ = mask(text)
+        return self.memory.search(masked, limit=limit, namespace=self._cache_namespace)
+
+    def cache_stats(self) -> str:
+        if self.cache is None:
+            return "Cache: disabled"
+        return self.cache.format_stats()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests  # pyright: ignore[reportMissingImports]
+from requests.adapters import HTTPAdapter  # pyright: ignore[reportMissingImports]
+
+from config import load_config
+
+
+class HttpTransport:
+    """Shared HTTP client with keep-alive connection pooling.
+
+    One pooled session serves translation and auth, so consecutive requests
+    to the same host reuse the TCP/TLS connection instead of paying the
+    handshake again. Responses are requested gzip-compressed.
+    """
+
+    USER_AGENT = "Mozilla/5.0"
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 15.0, pool_size: int = 10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": self.USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "HttpTransport":
+        config = config or load_config()
+        return cls(
+            connect_timeout=float(config.get("http_connect_timeout", 5.0)),
+            read_timeout=float(config.get("http_read_timeout", 15.0)),
+            pool_size=int(config.get("http_pool_size", 10)),
+        )
+
+    def bounded(self, timeout: Optional[float]):
+        """(connect, read) timeouts, each capped at timeout seconds when one is given"""
+        if timeout is None:
+            return self.timeout
+        return tuple(min(limit, max(timeout, 0.001)) for limit in self.timeout)
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None, timeout=None):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+
+    def post(self, url: str, data=None, json=None, headers: Optional[dict] = None, timeout=None):
+        return self.session.post(url, data=data, json=json, headers=headers, timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport:
+    """asyncio front end for HttpTransport.
+
+    Requests run on a thread pool no larger than the connection pool, so any
+    number of coroutines share the same few keep-alive connections.
+    """
+
+    def __init__(self, transport: Optional[HttpTransport] = None):
+        self.transport = transport or get_transport()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.transport.pool_size, thread_name_prefix="http"
+        )
+
+    async def get(self, url: str, **kwargs):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.transport.get, url, **kwargs))
+
+    async def post(self, url: str, **kwargs):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.transport.post, url, **kwargs))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def get_transport(config: Optional[dict] = None) -> HttpTransport:
+    """Process-wide transport used by every component"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport.from_config(config)
+        return _shared_transport
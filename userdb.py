@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from config import get_app_dir
+
+
+# Every document (flat users.json, manifest, shard) must stay below this size
+MAX_DOCUMENT_BYTES = 100000
+
+
+class CachedDocument:
+    """Remote JSON document mirrored on disk and revalidated conditionally.
+
+    The last good copy is stored with its ETag/Last-Modified. Within
+    `fresh_for` seconds of the last check the copy is used without any
+    request; after that it is revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged document costs a bodyless 304. If the
+    server cannot be reached the copy is still used as long as it was
+    validated less than `max_stale` seconds ago. A 404/410 is remembered
+    the same way: for `fresh_for` seconds the document is known to be
+    absent and `get` returns None without a request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        parse: Callable[[bytes], object],
+        fresh_for: float = 300.0,
+        max_stale: float = 24 * 3600.0,
+        timeout: float = 10.0,
+        cache_dir: Optional[str] = None,
+    ):
+        self.url = url
+        self.parse = parse
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.timeout = timeout
+        cache_dir = cache_dir or os.path.join(get_app_dir(), "userdb")
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        self.body_path = os.path.join(cache_dir, f"{name}.json")
+        self.meta_path = os.path.join(cache_dir, f"{name}.meta.json")
+        self._lock = threading.Lock()
+        self._value = None
+        self._meta = None
+
+    def _load_local(self):
+        if self._meta is not None:
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("absent"):
+                self._meta = meta
+                return
+            with open(self.body_path, "rb") as f:
+                value = self.parse(f.read())
+        except (OSError, ValueError):
+            self._meta = {}
+            return
+        self._meta, self._value = meta, value
+
+    def _store(self, body: bytes, headers):
+        os.makedirs(os.path.dirname(self.body_path), exist_ok=True)
+        meta = {
+            "url": self.url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "validated_at": time.time(),
+        }
+        for path, data in ((self.body_path, body), (self.meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._meta = meta
+
+    def _store_absent(self):
+        os.makedirs(os.path.dirname(self.meta_path), exist_ok=True)
+        self._meta = {"url": self.url, "absent": True, "validated_at": time.time()}
+        self._value = None
+        try:
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(self._meta, f)
+            os.remove(self.body_path)
+        except OSError:
+            pass
+
+    def _mark_validated(self):
+        self._meta["validated_at"] = time.time()
+        try:
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(self._meta, f)
+        except OSError:
+            pass
+
+    def _age(self) -> float:
+        return time.time() - self._meta.get("validated_at", 0)
+
+    def get(self):
+        """Current document, or None if there is neither a live nor a usable cached copy"""
+        from transport import get_transport
+
+        with self._lock:
+            self._load_local()
+            if self._age() < self.fresh_for and (self._value is not None or self._meta.get("absent")):
+                return self._value
+
+            headers = {}
+            if self._value is not None:
+                if self._meta.get("etag"):
+                    headers["If-None-Match"] = self._meta["etag"]
+                if self._meta.get("last_modified"):
+                    headers["If-Modified-Since"] = self._meta["last_modified"]
+
+            try:
+                response = get_transport().get(self.url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304 and self._value is not None:
+                    self._mark_validated()
+                    return self._value
+                if response.status_code == 200:
+                    body = response.content
+                    value = self.parse(body)
+                    self._store(body, response.headers)
+                    self._value = value
+                    return value
+                if response.status_code in (404, 410):
+                    self._store_absent()
+                    return None
+            except (OSError, ValueError):
+                pass
+
+            # Server unreachable or answered garbage: serve the last good copy if recent enough
+            if self._value is not None and self._age() < self.max_stale:
+                return self._value
+            return None
+
+
+class UserStoreUnavailable(Exception):
+    pass
+
+
+def parse_user_table(data: bytes) -> dict:
+    if len(data) > MAX_DOCUMENT_BYTES:
+        raise ValueError("User table too large")
+    parsed = json.loads(data.decode("utf-8"))
+    if not isinstance(parsed, dict):
+        raise ValueError("User table must be a JSON object")
+    return parsed
+
+
+def parse_manifest(data: bytes) -> dict:
+    manifest = parse_user_table(data)
+    if manifest.get("version") != 1 or not isinstance(manifest.get("prefix_length"), int):
+        raise ValueError("Unsupported user store manifest")
+    return manifest
+
+
+def shard_key(username: str, prefix_length: int) -> str:
+    return hashlib.sha256(username.encode("utf-8")).hexdigest()[:prefix_length]
+
+
+class ShardedUserStore:
+    """Username → password hash lookup that fetches only one small shard.
+
+    Layout under `base_url` (built by build_user_shards.py):
+
+        manifest.json          {"version": 1, "prefix_length": 3, "users": N}
+        shards/<prefix>.json   {"username": "sha256 hex", ...}
+
+    where <prefix> is the first `prefix_length` hex digits of the SHA-256 of
+    the username. Each document is cached by CachedDocument. If there is no
+    manifest, the flat `fallback_url` users.json is used instead; once it
+    has answered, the manifest is not probed again for `fresh_for` seconds.
+    """
+
+    def __init__(self, base_url: str, fallback_url: Optional[str] = None, **cache_options):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.fallback_url = fallback_url
+        self.cache_options = cache_options
+        self.manifest = CachedDocument(self.base_url + "manifest.json", parse_manifest, **cache_options)
+        self.fresh_for = self.manifest.fresh_for
+        self._fallback_until = 0.0
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def _document(self, url: str) -> CachedDocument:
+        with self._lock:
+            document = self._documents.get(url)
+            if document is None:
+                document = self._documents[url] = CachedDocument(url, parse_user_table, **self.cache_options)
+            return document
+
+    def lookup(self, username: str) -> Optional[str]:
+        """Stored password hash for username, None if there is no such user"""
+        # While the flat file is known to serve, skip the manifest round trip entirely
+        manifest = self.manifest.get() if time.monotonic() >= self._fallback_until else None
+        if manifest is not None:
+            prefix = shard_key(username, manifest["prefix_length"])
+            table = self._document(f"{self.base_url}shards/{prefix}.json").get()
+        elif self.fallback_url:
+            table = self._document(self.fallback_url).get()
+            if table is not None:
+                self._fallback_until = time.monotonic() + self.fresh_for
+        else:
+            table = None
+
+        if table is None:
+            raise UserStoreUnavailable("Failed to connect to authentication server")
+        stored_hash = table.get(username)
+        return stored_hash if isinstance(stored_hash, str) else None
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import Callable, Optional
+
+
+class TranslationWorker:
+    """Single long-lived translation thread with latest-wins semantics.
+
+    Every request gets a sequence number. Only the newest request is kept
+    pending: submitting again replaces it, and a request identical to the
+    pending or in-flight one is coalesced into it. Results of superseded
+    requests are dropped instead of being delivered, so a slow old request
+    can never overwrite a newer one.
+
+    `on_result(seq, text, result, error)` is called on the worker thread.
+    A request may bring its own translate function and result callback.
+    """
+
+    def __init__(self, translate: Callable[[str], str], on_result: Callable):
+        self.translate = translate
+        self.on_result = on_result
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._latest = 0
+        self._pending = None
+        self._inflight = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="translation-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, translate: Optional[Callable] = None, on_result: Optional[Callable] = None) -> int:
+        translate = translate or self.translate
+        on_result = on_result or self.on_result
+        with self._cond:
+            self.submitted += 1
+            if self._pending is not None and self._pending[1:3] == (text, translate):
+                self.coalesced += 1
+                return self._pending[0]
+            if (
+                self._pending is None
+                and self._inflight is not None
+                and self._inflight[1:3] == (text, translate)
+            ):
+                self.coalesced += 1
+                self._latest = self._inflight[0]
+                return self._latest
+
+            if self._pending is not None:
+                self.dropped += 1
+            self._seq += 1
+            self._latest = self._seq
+            self._pending = (self._seq, text, translate, on_result)
+            self._cond.notify()
+            return self._seq
+
+    def is_current(self, seq: int) -> bool:
+        with self._cond:
+            return seq == self._latest
+
+    def running(self) -> Optional[int]:
+        """Sequence number of the request in flight, if any"""
+        with self._cond:
+            return self._inflight[0] if self._inflight is not None else None
+    
+    def busy(self) -> bool:
+        """Whether a request is pending or in flight"""
+        with self._cond:
+            return self._pending is not None or self._inflight is not None
+    
+    def cancel(self):
+        """Forget the pending request and ignore the one in flight"""
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+                self._pending = None
+            self._seq += 1
+            self._latest = self._seq
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+
+    def _next(self) -> Optional[tuple]:
+        with self._cond:
+            while self._pending is None and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+            self._inflight, self._pending = self._pending, None
+            return self._inflight
+
+    def _run(self):
+        while True:
+            request = self._next()
+            if request is None:
+                return
+            seq, text, translate, on_result = request
+            try:
+                result, error = translate(text), None
+            except Exception as e:
+                result, error = None, e
+
+            with self._cond:
+                self._inflight = None
+                current = seq == self._latest
+                if not current:
+                    self.dropped += 1
+            if current:
+                on_result(seq, text, result, error)